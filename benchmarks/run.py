@@ -0,0 +1,487 @@
+"""Offline benchmark suite for the stats and rendering hot paths.
+
+Runs every case against synthetic contribution histories (1, 8 and 20 years,
+dense and sparse), plus fresh-interpreter import cost — no token, no network
+— and reports time per call,
+throughput and peak traced memory, compared against `baseline.json` next to
+this file. Run from the repo root with `make bench` or
+`python -m benchmarks.run`; `--update-baseline` rewrites the baseline so
+performance changes show up in its diff.
+
+Non-obvious invariants:
+    - Histories come from a seeded RNG and end on a fixed day, so every run
+      measures the same inputs; only timings vary between machines.
+    - Time is the best per-call mean over `--rounds` rounds (timeit
+      autorange); peak memory comes from a separate single call under
+      tracemalloc, so tracing overhead never skews timings.
+    - Baseline figures are rounded to 3 significant digits to keep its diffs
+      readable; compare baselines recorded on the same machine only.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import partial
+from pathlib import Path
+
+from profile_card import (
+    CARD_STYLES,
+    CardContext,
+    Config,
+    build_card_context,
+    create_svg_grid_with_heatmap,
+    create_svg_legend,
+    load_config,
+    map_contributions_to_levels,
+    render_card,
+    render_styles,
+    summarize_contributions,
+)
+from profile_card.cards import (
+    HEATMAP_CELLS,
+    create_svg_grid_labels,
+    resolve_placeholders,
+)
+from profile_card.pipeline import BACKGROUND_MARKER, SHARED_MARKERS, style_templates
+from profile_card.series import ContributionSeries
+from profile_card.stats import compute_stats
+
+logger = logging.getLogger(__name__)
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Synthetic histories end here; `compute_stats` treats it as "today".
+BENCH_END_DAY = date(2025, 12, 31)
+BENCH_SEED = 2018
+BENCH_YEARS = (1, 8, 20)
+# Share of days with at least one contribution.
+BENCH_DENSITY = {"dense": 0.9, "sparse": 0.1}
+BENCH_BATCH_USERS = (8, 32)
+
+# Relative slowdown (time or peak memory) reported as a regression.
+REGRESSION_THRESHOLD = 0.25
+BENCH_ROUNDS = 5
+
+
+# ── Inputs ─────────────────────────────────────────────────────────────────────
+
+
+def synthetic_history(years: int, density: float, seed: int) -> ContributionSeries:
+    """Return `years` of daily counts ending `BENCH_END_DAY`; `density` are non-zero."""
+    rng = random.Random(seed)
+    first = BENCH_END_DAY - timedelta(days=round(years * 365.25) - 1)
+    days = BENCH_END_DAY.toordinal() - first.toordinal() + 1
+    series = ContributionSeries(first.toordinal())
+    series.values.extend(
+        rng.randint(1, 60) if rng.random() < density else 0 for _ in range(days)
+    )
+    return series
+
+
+def synthetic_context(history: ContributionSeries, config: Config) -> CardContext:
+    """Build the `CardContext` a fetch of `history` would produce for `config`."""
+    data = summarize_contributions(history, public_repos=42, today=BENCH_END_DAY)
+    return build_card_context(data, config, steam_game="Factorio")
+
+
+def user_config(base: Config, name: str) -> Config:
+    """Return `base` with its user renamed to `name`."""
+    return {
+        "user": {"name": name, "display": name.title()},
+        "links": base["links"],
+        "steam_id": base["steam_id"],
+        "active_style": base["active_style"],
+    }
+
+
+# ── Cases ──────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Case:
+    """One benchmark: `run()` processes `items` units of `unit` per call."""
+
+    name: str
+    run: Callable[[], object]
+    items: int
+    unit: str
+
+
+def history_cases(base: Config) -> list[Case]:
+    """Stats, level-mapping and grid cases for every history length and density."""
+    cases: list[Case] = []
+    for years in BENCH_YEARS:
+        for density_name, density in BENCH_DENSITY.items():
+            label = f"{years}y-{density_name}"
+            history = synthetic_history(years, density, BENCH_SEED + years)
+            ctx = synthetic_context(history, base)
+            days = len(history)
+            cases += [
+                Case(
+                    f"compute_stats/{label}",
+                    partial(compute_stats, history, BENCH_END_DAY),
+                    days,
+                    "days",
+                ),
+                Case(
+                    f"map_contributions_to_levels/{label}",
+                    partial(map_contributions_to_levels, history),
+                    days,
+                    "days",
+                ),
+                Case(
+                    f"summarize_contributions/{label}",
+                    partial(summarize_contributions, history, 42, BENCH_END_DAY),
+                    days,
+                    "days",
+                ),
+            ]
+            if years == 1:
+                cases += grid_cases(label, ctx)
+            if years == 8:
+                cases.append(whole_history_grid_case(label, history))
+    return cases
+
+
+def whole_history_grid_case(label: str, history: ContributionSeries) -> Case:
+    """Stacked yearly-band grid over all of `history` (`--heatmap-range all`)."""
+    return Case(
+        f"create_svg_grid_with_heatmap/{label}-all",
+        partial(
+            create_svg_grid_with_heatmap,
+            map_contributions_to_levels(history),
+            history,
+        ),
+        len(history),
+        "cells",
+    )
+
+
+def grid_cases(label: str, ctx: CardContext) -> list[Case]:
+    """SVG generator cases over the heatmap window of `ctx`."""
+    cells = len(ctx.levels.tail(HEATMAP_CELLS))
+    return [
+        Case(
+            f"create_svg_grid_with_heatmap/{label}",
+            lambda: create_svg_grid_with_heatmap(ctx.levels, ctx.raw_counts),
+            cells,
+            "cells",
+        ),
+        Case(
+            f"create_svg_grid_with_heatmap/{label}-compact",
+            lambda: create_svg_grid_with_heatmap(
+                ctx.levels, ctx.raw_counts, compact=True
+            ),
+            cells,
+            "cells",
+        ),
+        Case(
+            f"create_svg_grid_labels/{label}",
+            lambda: create_svg_grid_labels(ctx.levels),
+            1,
+            "calls",
+        ),
+    ]
+
+
+def render_cases(base: Config, out_root: Path) -> list[Case]:
+    """Template, single-card and full-render cases on an 8-year dense history.
+
+    `render_styles` writes under `out_root`.
+    """
+    ctx = synthetic_context(synthetic_history(8, BENCH_DENSITY["dense"], 1), base)
+    cases = [Case("create_svg_legend", create_svg_legend, 1, "calls")]
+    for style_name, style in CARD_STYLES.items():
+        template, _ = style_templates(style)
+        values = resolve_placeholders(template.placeholders, style.resolvers, ctx)
+        for marker in template.markers:
+            generate = style.extra_markers.get(marker) or SHARED_MARKERS.get(marker)
+            if generate is not None:
+                value = generate(ctx)
+                values[marker] = value if isinstance(value, str) else "".join(value)
+        values[BACKGROUND_MARKER] = ""
+        size = len(template.render(values))
+        cases += [
+            Case(
+                f"template_render/{style_name}",
+                partial(template.render, values),
+                size,
+                "chars",
+            ),
+            Case(
+                f"render_card/{style_name}",
+                partial(render_card, style, ctx),
+                1,
+                "cards",
+            ),
+        ]
+    outputs = sum(len(s.outputs) + bool(s.index_template) for s in CARD_STYLES.values())
+    # Whole-history heatmap: the largest documents, so peak memory here shows
+    # how marker values held for reuse across variants scale with card size.
+    whole_ctx = synthetic_context(ctx.data["history"], {**base, "heatmap_range": "all"})
+    cases += [
+        Case(
+            "render_styles/all",
+            lambda: render_styles(dict(CARD_STYLES), ctx, out_root),
+            outputs,
+            "files",
+        ),
+        Case(
+            "render_styles/whole_history",
+            lambda: render_styles(dict(CARD_STYLES), whole_ctx, out_root / "whole"),
+            outputs,
+            "files",
+        ),
+    ]
+    return cases
+
+
+def batch_cases(base: Config, out_root: Path) -> list[Case]:
+    """Multi-user cases: stats + levels + every style per roster user.
+
+    Each user renders into `out_root / <user>`, as in batch mode.
+    """
+    cases: list[Case] = []
+    for users in BENCH_BATCH_USERS:
+        roster = [
+            (
+                user_config(base, f"user{i:02d}"),
+                synthetic_history(
+                    BENCH_YEARS[i % len(BENCH_YEARS)],
+                    BENCH_DENSITY["dense" if i % 2 else "sparse"],
+                    BENCH_SEED + i,
+                ),
+            )
+            for i in range(users)
+        ]
+        cases.append(
+            Case(
+                f"batch/{users}-users",
+                partial(render_roster, roster, out_root),
+                users,
+                "users",
+            )
+        )
+    return cases
+
+
+def render_roster(
+    roster: list[tuple[Config, ContributionSeries]], out_root: Path
+) -> None:
+    """Build each user's context from its history and render every style."""
+    for config, history in roster:
+        render_styles(
+            dict(CARD_STYLES),
+            synthetic_context(history, config),
+            out_root / config["user"]["name"],
+        )
+
+
+def import_cases() -> list[Case]:
+    """Fresh-interpreter startup: bare, importing the package, one style.
+
+    The difference is the package's import cost; `requests`, card modules
+    and `importlib.metadata` must not be part of it (they load on first
+    network use / style lookup / plugin discovery). Looking up one built-in
+    style imports only that style's module.
+    """
+    return [
+        Case(
+            f"import/{label}",
+            partial(subprocess.run, [sys.executable, "-c", code], check=True),
+            1,
+            "runs",
+        )
+        for label, code in (
+            ("python", "pass"),
+            (
+                "profile_card",
+                "import sys, profile_card; assert 'requests' not in sys.modules; "
+                "assert 'profile_card.cards.glass' not in sys.modules",
+            ),
+            (
+                "style_glass",
+                "import sys, profile_card; profile_card.CARD_STYLES['glass']; "
+                "assert 'profile_card.cards.man' not in sys.modules; "
+                "assert 'importlib.metadata' not in sys.modules",
+            ),
+        )
+    ]
+
+
+# ── Measurement ────────────────────────────────────────────────────────────────
+
+
+def measure(case: Case, rounds: int) -> dict[str, float]:
+    """Return `{ms, per_s, peak_kib}` for `case` (best of `rounds`)."""
+    timer = timeit.Timer(case.run)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=rounds, number=number)) / number
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms": best * 1000, "per_s": case.items / best, "peak_kib": peak / 1024}
+
+
+def _round(value: float) -> float:
+    """Round to 3 significant digits."""
+    return float(f"{value:.3g}")
+
+
+def _delta(current: float, baseline: float | None) -> float | None:
+    """Relative change from `baseline`, or None without one."""
+    if not baseline:
+        return None
+    return current / baseline - 1
+
+
+def report(
+    results: dict[str, dict[str, float]],
+    units: dict[str, str],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Print a results table against `baseline`; return regressed case names."""
+    regressions: list[str] = []
+    header = (
+        f"{'case':<48} {'ms/call':>10} {'throughput':>22} "
+        f"{'peak KiB':>10} {'Δ time':>8} {'Δ peak':>8}"
+    )
+    print(header)
+    print("─" * len(header))
+    for name, result in results.items():
+        base = baseline.get(name, {})
+        d_time = _delta(result["ms"], base.get("ms"))
+        d_peak = _delta(result["peak_kib"], base.get("peak_kib"))
+        regressed = any(d is not None and d > threshold for d in (d_time, d_peak))
+        if regressed:
+            regressions.append(name)
+        throughput = f"{result['per_s']:,.0f} {units[name]}/s"
+        print(
+            f"{name:<48} {result['ms']:>10.3f} {throughput:>22} "
+            f"{result['peak_kib']:>10.1f} "
+            f"{'new' if d_time is None else f'{d_time:+.0%}':>8} "
+            f"{'new' if d_peak is None else f'{d_peak:+.0%}':>8}"
+            f"{'  ← regression' if regressed else ''}"
+        )
+    return regressions
+
+
+def load_baseline(path: Path) -> dict[str, dict[str, float]]:
+    """Return the baseline's per-case results; empty when `path` is missing."""
+    try:
+        cases: dict[str, dict[str, float]] = json.loads(
+            path.read_text(encoding="utf-8")
+        )["cases"]
+    except FileNotFoundError:
+        return {}
+    return cases
+
+
+def save_baseline(path: Path, results: dict[str, dict[str, float]]) -> None:
+    """Write `results` (rounded) with the interpreter and platform they ran on."""
+    payload = {
+        "python": platform.python_version(),
+        "platform": f"{platform.system()}-{platform.machine()}",
+        "cases": {
+            name: {key: _round(value) for key, value in result.items()}
+            for name, result in sorted(results.items())
+        },
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Return the benchmark CLI parser."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-k",
+        "--filter",
+        default="",
+        help="Only run cases whose name contains this substring.",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=BENCH_ROUNDS,
+        help=f"Timing rounds per case; the best is kept (default {BENCH_ROUNDS}).",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=BASELINE_PATH,
+        help="Baseline JSON to compare against (default: benchmarks/baseline.json).",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write this run's results to --baseline (merged with unrun cases).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=REGRESSION_THRESHOLD,
+        help="Relative slowdown flagged as a regression (default "
+        f"{REGRESSION_THRESHOLD}).",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if any case regressed past --threshold.",
+    )
+    return parser
+
+
+def main() -> int:
+    """Run the selected cases, report them and optionally update the baseline."""
+    args = _build_parser().parse_args()
+    # Rendering logs every written file; keep the report readable.
+    logging.basicConfig(level=logging.WARNING)
+
+    base = load_config()
+    with tempfile.TemporaryDirectory(prefix="profile-card-bench-") as tmp:
+        out_root = Path(tmp)
+        cases = [
+            case
+            for case in (
+                import_cases()
+                + history_cases(base)
+                + render_cases(base, out_root)
+                + batch_cases(base, out_root / "batch")
+            )
+            if args.filter in case.name
+        ]
+        results = {case.name: measure(case, args.rounds) for case in cases}
+    baseline = load_baseline(args.baseline)
+    regressions = report(
+        results, {c.name: c.unit for c in cases}, baseline, args.threshold
+    )
+
+    if args.update_baseline:
+        save_baseline(args.baseline, {**baseline, **results})
+        print(f"\nBaseline written: {args.baseline}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) past {args.threshold:.0%}")
+        if args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,64 @@
 """GitHub profile card generator — CLI entry point.
 
-Thin orchestrator: validates assets, fetches shared data once, dispatches to
-each active card's resolver. Card logic lives in `profile_card.cards`;
+Thin orchestrator: parses flags, loads config, then hands one user (or a batch
+roster) to `profile_card.pipeline`. Card logic lives in `profile_card.cards`;
 network I/O in `profile_card.fetchers`. See CONTRIBUTING.md for usage.
 """
 
 import argparse
+import contextlib
 import logging
 import os
 import re
 import sys
 import time
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from profile_card import (
+    BATCH_MAX_WORKERS,
+    BUILTIN_CARD_STYLES,
     CARD_STYLES,
+    CONNECTION_ERROR_STATUS,
+    DOCS_DIR,
+    FETCH_MAX_WORKERS,
+    HISTORY_DB_PATH,
+    MANIFEST_PATH,
+    PROFILE_DIR,
+    REFRESH_INTERVAL_SECONDS,
+    RENDER_MAX_WORKERS,
+    SERVER_CACHE_TTL_SECONDS,
+    STEAM_CACHE_TTL_SECONDS,
+    WATCH_POLL_SECONDS,
+    BuildManifest,
     CardContext,
     CardStyle,
-    create_svg_grid_with_heatmap,
-    create_svg_legend,
-    fetch_contributions_from_github,
-    fetch_currently_playing_from_steam,
+    CardWatcher,
+    Config,
+    HistoryStore,
+    Refresher,
+    disable_tracing,
+    enable_tracing,
+    fetch_card_context,
+    fingerprint,
+    load_card_context,
     load_config,
-    map_contributions_to_levels,
-    read_background_fragment,
+    load_roster,
+    parse_heatmap_range,
+    profile_run,
+    render_batch,
+    render_styles,
+    span,
+    use_transport,
+    validate_template_files,
+    wait_for_steam_revalidations,
+    write_text_atomic,
 )
 
+if TYPE_CHECKING:
+    from profile_card import CardServer
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s %(levelname)s %(message)s",
@@ -33,195 +66,567 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-ASSETS_DIR = Path("assets")
-DOCS_DIR = Path("docs")
 README_PATH = Path("README.md")
 
-_UNREPLACED_PLACEHOLDER_RE = re.compile(r"\{\{[^}]+\}\}")
+# Stand-in credential for --replay runs without real tokens.
+REPLAY_TOKEN = "replay"
+
 _README_CARD_PATH_RE = re.compile(r"docs/[^/)]+/profile-card\.[^)]+\.svg")
 _LANDING_REDIRECT_RE = re.compile(r"url=\./[^/\s]+/")
-_TRAILING_WS_RE = re.compile(r"[ \t]+$", re.MULTILINE)
-
-
-def _apply_substitutions(svg: str, subs: dict[str, str]) -> str:
-    """Replace each key in `subs` with its value. Single pass per key (no re-scan)."""
-    for key, value in subs.items():
-        svg = svg.replace(key, value)
-    return svg
 
 
-def _resolve_steam_game(active_styles: dict[str, CardStyle], steam_id: str) -> str:
-    """Fetch the Steam game name, or return `"nothing"`.
+def _rewrite_refs(
+    path: Path,
+    pattern: re.Pattern[str],
+    replacement: str,
+    manifest: BuildManifest | None,
+) -> int:
+    """Substitute `pattern` in `path` in place; return occurrences if rewritten.
 
-    `"nothing"` is also returned when no active style has `needs_steam=True`
-    or when `STEAM_API_KEY` env var is unset (with a warning).
+    Skipped without reading when `manifest` shows `path` untouched since the
+    last rewrite to `replacement`.
     """
-    if not any(s.needs_steam for s in active_styles.values()):
-        return "nothing"
-    api_key = os.getenv("STEAM_API_KEY")
-    if not api_key:
-        logger.warning(
-            "Steam-requiring style active but STEAM_API_KEY not set — "
-            "recently-playing placeholder will fall back to 'nothing'."
-        )
-        return "nothing"
-    return fetch_currently_playing_from_steam(api_key, steam_id) or "nothing"
-
-
-def _update_active_style_refs(active_style: str, style: CardStyle) -> None:
+    fp = fingerprint(pattern.pattern, replacement)
+    if not path.is_file() or (manifest is not None and manifest.is_current(path, fp)):
+        return 0
+    text = path.read_text(encoding="utf-8")
+    updated, n = pattern.subn(replacement, text)
+    written = bool(n) and updated != text
+    if written:
+        write_text_atomic(path, updated)
+    if manifest is not None:
+        manifest.record(path, fp)
+    return n if written else 0
+
+
+def _update_active_style_refs(
+    active_style: str, manifest: BuildManifest | None = None
+) -> None:
     """Point README and docs landing redirect at the configured active style.
 
     Rewrites in-place: README image path (any `docs/<x>/profile-card.<y>.svg`
-    occurrences) and `docs/index.html` `<meta refresh>` target.
+    occurrences) and `docs/index.html` `<meta refresh>` target. Built-in
+    styles are described without importing their module.
     """
-    filename = style.outputs[0][0]
-    new_path = f"docs/{style.subdir}/{filename}"
+    descriptor = CARD_STYLES.describe(active_style)
+    new_path = f"docs/{descriptor.subdir}/{descriptor.primary_output}"
 
-    if README_PATH.is_file():
-        readme = README_PATH.read_text(encoding="utf-8")
-        updated, n = _README_CARD_PATH_RE.subn(new_path, readme)
-        if n and updated != readme:
-            README_PATH.write_text(updated, encoding="utf-8")
-            logger.info("README.md: card path → %s (%d occurrence(s))", new_path, n)
+    n = _rewrite_refs(README_PATH, _README_CARD_PATH_RE, new_path, manifest)
+    if n:
+        logger.info("README.md: card path → %s (%d occurrence(s))", new_path, n)
 
     landing = DOCS_DIR / "index.html"
-    if landing.is_file():
-        html = landing.read_text(encoding="utf-8")
-        updated, n = _LANDING_REDIRECT_RE.subn(f"url=./{active_style}/", html)
-        if n and updated != html:
-            landing.write_text(updated, encoding="utf-8")
-            logger.info("docs/index.html: redirect → ./%s/", active_style)
-
-
-def _validate_template_files(active_styles: dict[str, CardStyle]) -> None:
-    """Raise on first missing template/background — run before any network call."""
-    for style_name, style in active_styles.items():
-        template_path = ASSETS_DIR / style.template
-        if not template_path.is_file():
-            raise FileNotFoundError(
-                f"Style '{style_name}' template missing: {template_path}"
-            )
-        if style.background:
-            bg_path = DOCS_DIR / style.subdir / style.background
-            if not bg_path.is_file():
-                raise FileNotFoundError(
-                    f"Style '{style_name}' background missing: {bg_path}"
-                )
-        if style.index_template:
-            index_path = ASSETS_DIR / style.index_template
-            if not index_path.is_file():
-                raise FileNotFoundError(
-                    f"Style '{style_name}' index template missing: {index_path}"
-                )
+    redirect = f"url=./{active_style}/"
+    if _rewrite_refs(landing, _LANDING_REDIRECT_RE, redirect, manifest):
+        logger.info("docs/index.html: redirect → ./%s/", active_style)
+
+
+def _render_from_cache(
+    args: argparse.Namespace,
+    config: Config,
+    active_styles: dict[str, CardStyle],
+    store: HistoryStore,
+    manifest: BuildManifest,
+) -> int:
+    """Render the config user (or `--roster`) from `store` without any network."""
+    if args.roster:
+        targets = [
+            (user, DOCS_DIR / user["user"]["name"])
+            for user in load_roster(args.roster, config)
+        ]
+    else:
+        targets = [(config, DOCS_DIR)]
+    files_written = 0
+    for user, out_root in targets:
+        ctx = load_card_context(user, store, args.compact)
+        files_written += render_styles(
+            active_styles, ctx, out_root, manifest, args.jobs
+        )
+    if not args.roster:
+        active_style = config["active_style"]
+        _update_active_style_refs(active_style, manifest)
+    return files_written
 
 
-def main() -> None:
-    """Orchestrate the contribution card update pipeline."""
+def _serve_forever(server: "CardServer") -> None:
+    """Run `server` until interrupted, then close its socket."""
+    host, port = server.server_address[:2]
+    logger.info("Serving cards on http://%s:%s/<user>/<style>.svg", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+
+
+def _run_daemon(
+    args: argparse.Namespace,
+    config: Config,
+    active_styles: dict[str, CardStyle],
+    token: str,
+    store: HistoryStore | None,
+    manifest: BuildManifest,
+) -> None:
+    """Run the `--daemon` refresher for the config user or the `--roster`."""
+    if args.roster:
+        targets = [
+            (user, DOCS_DIR / user["user"]["name"])
+            for user in load_roster(args.roster, config)
+        ]
+    else:
+        targets = [(config, DOCS_DIR)]
+        active_style = config["active_style"]
+        _update_active_style_refs(active_style, manifest)
+    refresher = Refresher(
+        targets,
+        active_styles,
+        token,
+        store,
+        manifest,
+        interval=args.interval,
+        fetch_workers=args.fetch_workers,
+        jobs=args.jobs,
+        compact_heatmap=args.compact,
+        steam_ttl=args.steam_ttl,
+    )
+    try:
+        refresher.run()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+
+
+def _run_watch(
+    args: argparse.Namespace,
+    config: Config,
+    active_styles: dict[str, CardStyle],
+    token: str,
+    store: HistoryStore | None,
+    manifest: BuildManifest,
+) -> None:
+    """Render once, then run the `--watch` loop on the fetched data."""
+
+    def load(user: Config) -> CardContext:
+        if args.from_cache and store is not None:
+            return load_card_context(user, store, args.compact)
+        return fetch_card_context(
+            user,
+            active_styles,
+            token,
+            store,
+            args.fetch_workers,
+            args.compact,
+            args.steam_ttl,
+        )
+
+    watcher = CardWatcher(
+        load(config),
+        active_styles,
+        partial(_load_config, args),
+        load,
+        manifest=manifest,
+        jobs=args.jobs,
+        interval=args.watch_interval,
+    )
+    files_written = render_styles(
+        active_styles, watcher.ctx, manifest=manifest, jobs=args.jobs
+    )
+    manifest.save()
+    logger.info("Rendered %d file(s)", files_written)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Return the CLI argument parser."""
     parser = argparse.ArgumentParser(description="Generate GitHub profile card SVGs.")
     parser.add_argument(
         "--style",
         default="all",
-        choices=[*CARD_STYLES, "all"],
-        help="Card style to generate (default: all).",
+        help=(
+            "Card style to generate: a built-in style "
+            f"({', '.join(d.name for d in BUILTIN_CARD_STYLES)}), an installed "
+            "plugin style, or all (default: all)."
+        ),
     )
-    args = parser.parse_args()
-    active_styles = (
-        CARD_STYLES if args.style == "all" else {args.style: CARD_STYLES[args.style]}
+    parser.add_argument(
+        "--history-db",
+        type=Path,
+        default=HISTORY_DB_PATH,
+        help=f"Local contribution history store (default: {HISTORY_DB_PATH}).",
     )
-    logger.info("Generating styles: %s", ", ".join(active_styles))
-    start_time = time.perf_counter()
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Ignore the history store and refetch the full history.",
+    )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=FETCH_MAX_WORKERS,
+        help=(
+            "Concurrent GitHub chunk requests, 1 for sequential "
+            f"(default and max: {FETCH_MAX_WORKERS})."
+        ),
+    )
+    parser.add_argument(
+        "--roster",
+        type=Path,
+        help=(
+            "Batch mode: JSON list of config-shaped user entries; renders each "
+            "into docs/<user>/<style>/ and leaves README/landing page untouched."
+        ),
+    )
+    parser.add_argument(
+        "--batch-workers",
+        type=int,
+        default=BATCH_MAX_WORKERS,
+        help=(
+            f"Users fetched concurrently in batch mode (default: {BATCH_MAX_WORKERS})."
+        ),
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Emit the compact heatmap encoding (<use> cells grouped by level).",
+    )
+    parser.add_argument(
+        "--heatmap-range",
+        metavar="RANGE",
+        help=(
+            "Heatmap days to render, overriding config.heatmap_range: 52w "
+            "(default), all, 2024, 2018-2025 or 2024-03-01:2024-06-30. "
+            "Ranges over 53 weeks stack one row per year."
+        ),
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=MANIFEST_PATH,
+        help=f"Build manifest of output fingerprints (default: {MANIFEST_PATH}).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the manifest: render and write every output.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=RENDER_MAX_WORKERS,
+        help=(
+            "Output files rendered concurrently per user, 1 for sequential "
+            f"(default: {RENDER_MAX_WORKERS})."
+        ),
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help=(
+            "Serve cards over HTTP at /<user>/<style>.svg instead of writing files "
+            "(config.json user plus any --roster users)."
+        ),
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address to bind with --serve (default: 127.0.0.1).",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=SERVER_CACHE_TTL_SECONDS,
+        help=(
+            "Seconds fetched data and cards stay cached with --serve "
+            f"(default: {SERVER_CACHE_TTL_SECONDS:g})."
+        ),
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=(
+            "Keep running and re-render on a jittered schedule, recently active "
+            "users first, with session, templates and history kept warm."
+        ),
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=REFRESH_INTERVAL_SECONDS,
+        help=(
+            "Seconds between --daemon refreshes of an idle user; active users "
+            f"refresh twice as often (default: {REFRESH_INTERVAL_SECONDS:g})."
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Render once, then keep the fetched data in memory and re-render "
+            "the styles whose template, background or config.json changes."
+        ),
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=WATCH_POLL_SECONDS,
+        metavar="SECONDS",
+        help=f"Seconds between --watch file checks (default: {WATCH_POLL_SECONDS:g}).",
+    )
+    parser.add_argument(
+        "--steam-ttl",
+        type=float,
+        default=STEAM_CACHE_TTL_SECONDS,
+        help=(
+            "Seconds a stored Steam answer is reused without a request; older "
+            "answers are refreshed (in the background under --serve/--daemon) "
+            "and still served if Steam fails "
+            f"(default: {STEAM_CACHE_TTL_SECONDS:g}; needs the history store)."
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        metavar="PATH",
+        help="Write timing spans for each run phase to PATH as JSON Lines.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            f"Profile the run: cProfile dump to {PROFILE_DIR}/profile.pstats plus "
+            "tracemalloc peak memory and top allocation sites. Fetches and "
+            "renders run serially on the main thread so cProfile sees them "
+            "(cProfile only profiles the thread that enabled it)."
+        ),
+    )
+    parser.add_argument(
+        "--from-cache",
+        action="store_true",
+        help=(
+            "Render from the history store only (last synced contributions, "
+            "repo count and Steam answer): no token, no network."
+        ),
+    )
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--record",
+        type=Path,
+        metavar="CASSETTE",
+        help="Append every GitHub/Steam response to CASSETTE (credentials omitted).",
+    )
+    transport.add_argument(
+        "--replay",
+        type=Path,
+        metavar="CASSETTE",
+        help=(
+            "Answer GitHub/Steam requests from CASSETTE without network access; "
+            "no tokens needed."
+        ),
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Mean delay added to each replayed request attempt (default: 0).",
+    )
+    parser.add_argument(
+        "--replay-error-rate",
+        type=float,
+        default=0.0,
+        metavar="P",
+        help="Probability a replayed attempt fails, 0–1 (default: 0).",
+    )
+    parser.add_argument(
+        "--replay-error-status",
+        type=int,
+        default=503,
+        metavar="STATUS",
+        help=(
+            "HTTP status of injected failures; "
+            f"{CONNECTION_ERROR_STATUS} drops the connection (default: 503)."
+        ),
+    )
+    return parser
+
+
+def _install_transport(args: argparse.Namespace) -> None:
+    """Route outbound requests through a recording or replaying transport."""
+    if not (args.record or args.replay):
+        return
+    # Imported here: the transports load `requests`, which other runs defer.
+    from profile_card import Cassette, RecordingAdapter, ReplayAdapter
+
+    if args.record:
+        use_transport(RecordingAdapter(Cassette(args.record)))
+        logger.info("Recording responses to %s", args.record)
+    elif args.replay:
+        cassette = Cassette(args.replay)
+        if not len(cassette):
+            raise FileNotFoundError(f"No recorded responses in {args.replay}")
+        use_transport(
+            ReplayAdapter(
+                cassette,
+                args.replay_latency,
+                args.replay_error_rate,
+                args.replay_error_status,
+            )
+        )
+        # Recorded requests carry no credentials, so any key replays.
+        os.environ.setdefault("GITHUB_TOKEN", REPLAY_TOKEN)
+        os.environ.setdefault("STEAM_API_KEY", REPLAY_TOKEN)
+        logger.info("Replaying %d response(s) from %s", len(cassette), args.replay)
+
 
-    config = load_config()
+def main() -> None:
+    """Orchestrate the contribution card update pipeline."""
+    parser = _build_parser()
+    args = parser.parse_args()
+    if args.style != "all" and args.style not in CARD_STYLES:
+        parser.error(
+            f"argument --style: invalid choice: '{args.style}' "
+            f"(choose from {', '.join([*CARD_STYLES, 'all'])})"
+        )
+    if args.from_cache and (
+        args.no_history
+        or args.serve is not None
+        or args.daemon
+        or args.record
+        or args.replay
+    ):
+        parser.error(
+            "--from-cache renders files from the history store; it can't be "
+            "combined with --no-history, --serve, --daemon, --record or --replay"
+        )
+    if args.watch and (args.serve is not None or args.daemon or args.roster):
+        parser.error(
+            "--watch re-renders the config user's files; it can't be combined "
+            "with --serve, --daemon or --roster"
+        )
+    if args.heatmap_range is not None:
+        try:
+            parse_heatmap_range(args.heatmap_range)
+        except ValueError as e:
+            parser.error(str(e))
+    with contextlib.ExitStack() as stack:
+        if args.trace:
+            args.trace.parent.mkdir(parents=True, exist_ok=True)
+            enable_tracing(stack.enter_context(args.trace.open("w", encoding="utf-8")))
+            stack.callback(disable_tracing)
+        if args.profile:
+            stack.enter_context(profile_run())
+        with span("run"):
+            _run(args)
+
+
+def _load_config(args: argparse.Namespace) -> Config:
+    """Load and validate `config.json`, applying `--heatmap-range`."""
+    with span("config_load"):
+        config = load_config()
     active_style = config["active_style"]
     if active_style not in CARD_STYLES:
         raise ValueError(
             f"config.active_style '{active_style}' not in {sorted(CARD_STYLES)}"
         )
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise ValueError("Missing GITHUB_TOKEN environment variable.")
-
-    _validate_template_files(active_styles)
-
-    data = fetch_contributions_from_github(config["user"]["name"], token)
-    raw_counts = data["contributions"]
-    levels = map_contributions_to_levels(raw_counts)
+    if args.heatmap_range is not None:
+        config["heatmap_range"] = args.heatmap_range
+    elif "heatmap_range" in config:
+        parse_heatmap_range(config["heatmap_range"])
+    return config
 
-    steam_game = _resolve_steam_game(active_styles, config["steam_id"])
 
-    ctx = CardContext(
-        data=data,
-        levels=levels,
-        raw_counts=raw_counts,
-        config=config,
-        steam_game=steam_game,
+def _run(args: argparse.Namespace) -> None:
+    """Run the mode selected by `args` (files, batch, server, daemon or watch)."""
+    active_styles = (
+        dict(CARD_STYLES)
+        if args.style == "all"
+        else {args.style: CARD_STYLES[args.style]}
     )
+    logger.info("Generating styles: %s", ", ".join(active_styles))
+    start_time = time.perf_counter()
+    _install_transport(args)
 
-    shared_markers = {
-        "<!-- Contribution Grid Legend -->": create_svg_legend(),
-        "<!-- Contribution Grid -->": create_svg_grid_with_heatmap(levels, raw_counts),
-    }
+    config = _load_config(args)
+    active_style = config["active_style"]
+    token = os.getenv("GITHUB_TOKEN", "")
+    if not token and not args.from_cache:
+        raise ValueError("Missing GITHUB_TOKEN environment variable.")
 
-    files_written = 0
-    for style_name, style in active_styles.items():
-        style_dir = DOCS_DIR / style.subdir
-        style_dir.mkdir(parents=True, exist_ok=True)
-
-        template = (ASSETS_DIR / style.template).read_text(encoding="utf-8")
-        bg_fragment = (
-            read_background_fragment(style_dir, style.background)
-            if style.background
-            else ""
+    with span("validate_templates", styles=len(active_styles)):
+        validate_template_files(active_styles)
+
+    store = None if args.no_history else HistoryStore(args.history_db)
+    if args.serve is not None:
+        from profile_card import CardServer, CardService  # loads http.server
+
+        service = CardService(
+            [config, *(load_roster(args.roster, config) if args.roster else [])],
+            token,
+            active_styles,
+            store,
+            args.cache_ttl,
+            args.fetch_workers,
+            args.compact,
+            args.steam_ttl,
         )
-
-        markers = {
-            **shared_markers,
-            **{marker: fn(ctx) for marker, fn in style.extra_markers.items()},
-        }
-        placeholders = style.resolver(ctx)
-
-        for output_file, inject_bg in style.outputs:
-            try:
-                svg = template.replace(
-                    "<!-- Background -->", bg_fragment if inject_bg else ""
-                )
-                svg = _apply_substitutions(svg, markers)
-                svg = _apply_substitutions(svg, placeholders)
-                svg = _TRAILING_WS_RE.sub("", svg)
-                leftover = set(_UNREPLACED_PLACEHOLDER_RE.findall(svg))
-                if leftover:
-                    logger.warning(
-                        "Unreplaced placeholders in %s/%s: %s",
-                        style_name,
-                        output_file,
-                        ", ".join(sorted(leftover)),
-                    )
-                out_path = style_dir / output_file
-                out_path.write_text(svg, encoding="utf-8")
-                files_written += 1
-                logger.info("Written: %s", out_path)
-            except Exception as e:
-                logger.error(
-                    "Failed to process %s → %s: %s", style_name, output_file, e
-                )
-                raise
-
-        if style.index_template:
-            index_src = (ASSETS_DIR / style.index_template).read_text(encoding="utf-8")
-            rendered = _apply_substitutions(index_src, placeholders)
-            leftover = set(_UNREPLACED_PLACEHOLDER_RE.findall(rendered))
-            if leftover:
-                logger.warning(
-                    "Unreplaced placeholders in %s/index.html: %s",
-                    style_name,
-                    ", ".join(sorted(leftover)),
-                )
-            index_path = style_dir / "index.html"
-            index_path.write_text(rendered, encoding="utf-8")
-            files_written += 1
-            logger.info("Written: %s", index_path)
-
-    _update_active_style_refs(active_style, CARD_STYLES[active_style])
+        try:
+            _serve_forever(CardServer((args.host, args.serve), service))
+        finally:
+            if store is not None:
+                wait_for_steam_revalidations()
+                store.close()
+        return
+
+    manifest = BuildManifest(args.manifest, load=not args.force)
+    try:
+        if args.daemon:
+            _run_daemon(args, config, active_styles, token, store, manifest)
+            return
+        if args.watch:
+            _update_active_style_refs(active_style, manifest)
+            _run_watch(args, config, active_styles, token, store, manifest)
+            return
+        if args.from_cache and store is not None:
+            files_written = _render_from_cache(
+                args, config, active_styles, store, manifest
+            )
+        elif args.roster:
+            roster = load_roster(args.roster, config)
+            files_written = render_batch(
+                roster,
+                active_styles,
+                token,
+                store,
+                args.batch_workers,
+                args.fetch_workers,
+                args.compact,
+                manifest,
+                args.jobs,
+                args.steam_ttl,
+            )
+        else:
+            ctx = fetch_card_context(
+                config,
+                active_styles,
+                token,
+                store,
+                args.fetch_workers,
+                args.compact,
+                args.steam_ttl,
+            )
+            files_written = render_styles(
+                active_styles, ctx, manifest=manifest, jobs=args.jobs
+            )
+            _update_active_style_refs(active_style, manifest)
+    finally:
+        manifest.save()
+        if store is not None:
+            wait_for_steam_revalidations()
+            store.close()
 
     logger.info(
         "Done: %d file(s) in %.2fs", files_written, time.perf_counter() - start_time
@@ -1,6 +1,14 @@
-"""Top-level re-exports for the CLI entry point. See `__all__` for the surface."""
+"""Top-level re-exports for the CLI entry point. See `__all__` for the surface.
+
+`server` and `transport` exports load on first access: they import
+`http.server` and `requests`, which cache-only renders never need.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
 
 from profile_card.cards import (
+    BUILTIN_CARD_STYLES,
     CARD_STYLES,
     CardContext,
     CardStyle,
@@ -8,23 +16,145 @@ from profile_card.cards import (
     create_svg_legend,
     read_background_fragment,
 )
-from profile_card.config import Config, load_config
+from profile_card.config import Config, load_config, load_roster
 from profile_card.fetchers import (
+    CONNECTION_ERROR_STATUS,
+    FETCH_MAX_WORKERS,
+    STEAM_CACHE_TTL_SECONDS,
     fetch_contributions_from_github,
     fetch_currently_playing_from_steam,
     map_contributions_to_levels,
+    summarize_contributions,
+    use_transport,
+    wait_for_steam_revalidations,
+)
+from profile_card.heatmap import (
+    HEATMAP_DEFAULT_RANGE,
+    HeatmapRange,
+    heatmap_layout,
+    parse_heatmap_range,
+)
+from profile_card.manifest import (
+    MANIFEST_PATH,
+    BuildManifest,
+    fingerprint,
+    write_chunks_atomic,
+    write_text_atomic,
+)
+from profile_card.pipeline import (
+    ASSETS_DIR,
+    BATCH_MAX_WORKERS,
+    DOCS_DIR,
+    RENDER_MAX_WORKERS,
+    SERVER_CACHE_TTL_SECONDS,
+    build_card_context,
+    fetch_card_context,
+    invalidate_assets,
+    load_card_context,
+    load_template,
+    read_asset,
+    render_batch,
+    render_card,
+    render_card_chunks,
+    render_styles,
+    resolve_steam_game,
+    style_inputs,
+    validate_template_files,
+)
+from profile_card.refresher import REFRESH_INTERVAL_SECONDS, Refresher
+from profile_card.store import HISTORY_DB_PATH, HistoryStore
+from profile_card.tracing import (
+    PROFILE_DIR,
+    disable_tracing,
+    enable_tracing,
+    profile_run,
+    span,
 )
+from profile_card.watch import WATCH_POLL_SECONDS, CardWatcher, FileWatcher
+
+if TYPE_CHECKING:
+    from profile_card.server import CardServer, CardService
+    from profile_card.transport import Cassette, RecordingAdapter, ReplayAdapter
+
+_LAZY_EXPORTS = {
+    "CardServer": "profile_card.server",
+    "CardService": "profile_card.server",
+    "Cassette": "profile_card.transport",
+    "RecordingAdapter": "profile_card.transport",
+    "ReplayAdapter": "profile_card.transport",
+}
+
+
+def __getattr__(name: str) -> object:
+    """Import the module behind a lazy export on first access."""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
+
 
 __all__ = [
+    "ASSETS_DIR",
+    "BATCH_MAX_WORKERS",
+    "BUILTIN_CARD_STYLES",
     "CARD_STYLES",
+    "CONNECTION_ERROR_STATUS",
+    "DOCS_DIR",
+    "FETCH_MAX_WORKERS",
+    "HEATMAP_DEFAULT_RANGE",
+    "HISTORY_DB_PATH",
+    "MANIFEST_PATH",
+    "PROFILE_DIR",
+    "REFRESH_INTERVAL_SECONDS",
+    "RENDER_MAX_WORKERS",
+    "SERVER_CACHE_TTL_SECONDS",
+    "STEAM_CACHE_TTL_SECONDS",
+    "WATCH_POLL_SECONDS",
+    "BuildManifest",
+    "CardServer",
+    "CardService",
     "CardContext",
     "CardStyle",
+    "CardWatcher",
+    "Cassette",
     "Config",
+    "FileWatcher",
+    "HeatmapRange",
+    "HistoryStore",
+    "RecordingAdapter",
+    "Refresher",
+    "ReplayAdapter",
+    "build_card_context",
     "create_svg_grid_with_heatmap",
     "create_svg_legend",
+    "disable_tracing",
+    "enable_tracing",
+    "fetch_card_context",
     "fetch_contributions_from_github",
     "fetch_currently_playing_from_steam",
+    "fingerprint",
+    "heatmap_layout",
+    "invalidate_assets",
+    "load_card_context",
     "load_config",
+    "load_roster",
+    "load_template",
     "map_contributions_to_levels",
+    "parse_heatmap_range",
+    "profile_run",
+    "read_asset",
     "read_background_fragment",
+    "render_batch",
+    "render_card",
+    "render_card_chunks",
+    "render_styles",
+    "resolve_steam_game",
+    "span",
+    "style_inputs",
+    "summarize_contributions",
+    "use_transport",
+    "validate_template_files",
+    "wait_for_steam_revalidations",
+    "write_chunks_atomic",
+    "write_text_atomic",
 ]
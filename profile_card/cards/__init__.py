@@ -1,28 +1,49 @@
 """Card registry.
 
-Each card module is imported here for its side effect: at import time the
-module calls `register(...)` which populates `CARD_STYLES`. See
-CONTRIBUTING.md for adding a new style.
+`CARD_STYLES` maps style names to `CardStyle`s, importing each card module
+on first lookup: the built-in styles are listed in `BUILTIN_CARD_STYLES`,
+installed packages add theirs under the `profile_card.cards` entry-point
+group. See CONTRIBUTING.md for adding a new style.
 """
 
-from profile_card.cards import (
-    glass,  # noqa: F401 - side-effect import populates CARD_STYLES
-    man,  # noqa: F401 - side-effect import populates CARD_STYLES
-)
 from profile_card.cards._shared import (
+    BUILTIN_CARD_STYLES,
+    CARD_STYLE_ENTRY_POINT_GROUP,
     CARD_STYLES,
+    STEAM_GAME_PLACEHOLDER,
     CardContext,
     CardStyle,
+    MarkerGenerator,
+    Resolver,
+    StyleDescriptor,
+    StyleRegistry,
+    create_svg_grid_labels,
     create_svg_grid_with_heatmap,
     create_svg_legend,
+    iter_svg_grid_with_heatmap,
     read_background_fragment,
+    register,
+    resolve_placeholders,
 )
+from profile_card.heatmap import HEATMAP_CELLS
 
 __all__ = [
+    "BUILTIN_CARD_STYLES",
     "CARD_STYLES",
+    "CARD_STYLE_ENTRY_POINT_GROUP",
+    "HEATMAP_CELLS",
+    "STEAM_GAME_PLACEHOLDER",
     "CardContext",
     "CardStyle",
+    "MarkerGenerator",
+    "Resolver",
+    "StyleDescriptor",
+    "StyleRegistry",
+    "create_svg_grid_labels",
     "create_svg_grid_with_heatmap",
     "create_svg_legend",
+    "iter_svg_grid_with_heatmap",
     "read_background_fragment",
+    "register",
+    "resolve_placeholders",
 ]
@@ -1,26 +1,36 @@
 """Shared foundation for card modules.
 
-Holds `CardContext`, `CardStyle`, the `CARD_STYLES` registry + `register()`,
-the cross-card SVG generators, and small formatting helpers. Card modules
-import from here.
+Holds `CardContext`, `CardStyle`, the lazy `CARD_STYLES` registry +
+`register()`, the shared placeholder resolver tables, the cross-card SVG
+generators, and small formatting helpers. Card modules import from here.
 """
 
-from collections.abc import Callable
+import importlib
+import logging
+import re
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from functools import cached_property
 from pathlib import Path
 
 from profile_card.config import Config
-from profile_card.fetchers import HEATMAP_WEEKS, ContributionData
+from profile_card.fetchers import ContributionData
+from profile_card.heatmap import (
+    DEFAULT_HEATMAP_RANGE,
+    HEATMAP_DAYS_PER_WEEK,
+    HeatmapLayout,
+    HeatmapRange,
+    calculate_cell_dimensions,
+    heatmap_layout,
+)
+from profile_card.series import ContributionSeries
+from profile_card.tracing import span
+
+logger = logging.getLogger(__name__)
 
 # ── Heatmap / Legend Constants ─────────────────────────────────────────────────
 
-HEATMAP_DAYS_PER_WEEK = 7
-HEATMAP_CELLS = HEATMAP_WEEKS * HEATMAP_DAYS_PER_WEEK  # 364
-
-# Fraction of total grid width reserved for gaps between columns.
-GRID_SPACING_RATIO = 0.1
-
 # Gradient IDs referenced by SVG templates, keyed by intensity level (0–5).
 # Stroke IDs always follow the pattern f"{color_id}-stroke".
 CONTRIBUTION_COLORS = {
@@ -47,9 +57,16 @@ MONTH_ABBR: list[str] = [
     "Dec",
 ]
 
+# Minimum gap (px) between month label origins; closer labels are dropped so
+# 3-letter `.mono-sm` abbreviations never overlap at small cell sizes.
+MONTH_LABEL_MIN_SPACING = 24.0
+
 # Day-of-week indices (Monday=0) to render as row labels in the heatmap.
 HEATMAP_ROW_LABELS: list[tuple[int, str]] = [(0, "Mon"), (2, "Wed"), (4, "Fri")]
 
+# `<rect>` shared by every cell in the compact heatmap encoding (`<use>` refs).
+COMPACT_CELL_ID = "heat-cell"
+
 LEGEND_LABELS: dict[int, str] = {
     0: "0: Burnout / Sleep / Love / Death / Vacay — Who knows! ( ͡° ͜ʖ ͡°)",
     1: "1–10",
@@ -67,6 +84,19 @@ LEGEND_LONG_ITEM_WIDTH = 321.3  # width of level-0 item (cell + long label + gap
 LEGEND_SHORT_ITEM_WIDTH = 61.2  # width of each subsequent item (cell + short label)
 
 
+# Resolved by `CardContext.steam_game`; its presence in an active template is
+# what triggers the Steam fetch.
+STEAM_GAME_PLACEHOLDER = "{{st.game}}"
+
+_LINK_PLACEHOLDER_RE = re.compile(r"\{\{link\.([^.}]+)\.(url|display)\}\}")
+# `{{heatmap.shift.<n>}}`: coordinate or length `n` plus the height the heatmap
+# grows beyond one classic band, for everything laid out below the grid;
+# `{{heatmap.stretch.<n>}}`: the factor that scales height `n` to that size.
+_HEATMAP_GROW_PLACEHOLDER_RE = re.compile(
+    r"\{\{heatmap\.(shift|stretch)\.(\d+(?:\.\d+)?)\}\}"
+)
+
+
 # ── Dataclasses ────────────────────────────────────────────────────────────────
 
 
@@ -76,17 +106,33 @@ class CardContext:
 
     Attributes:
         data: Contribution stats from GitHub.
-        levels: ISO date → intensity level (0–5) mapping.
-        raw_counts: ISO date → raw contribution count mapping.
+        levels: Per-day intensity levels (0–5) over the heatmap window.
+        raw_counts: Per-day raw contribution counts over the heatmap window.
         config: Public runtime config (user identity, links, Steam ID).
         steam_game: Most-played Steam game name, or `"nothing"` if unavailable.
+        compact_heatmap: Emit the compact heatmap encoding (see
+            `create_svg_grid_with_heatmap`).
+        heatmap_range: Range the heatmap window was cut with.
     """
 
     data: ContributionData
-    levels: dict[str, int]
-    raw_counts: dict[str, int]
+    levels: ContributionSeries
+    raw_counts: ContributionSeries
     config: Config
     steam_game: str = "nothing"
+    compact_heatmap: bool = False
+    heatmap_range: HeatmapRange = DEFAULT_HEATMAP_RANGE
+
+    @cached_property
+    def heatmap_layout(self) -> HeatmapLayout:
+        """Calendar layout of `levels` on the default grid width."""
+        return heatmap_layout(self.levels)
+
+
+Resolver = Callable[[CardContext], str]
+
+# Marker content: one string, or chunks the renderer streams without joining.
+MarkerGenerator = Callable[[CardContext], str | Iterable[str]]
 
 
 @dataclass
@@ -97,39 +143,185 @@ class CardStyle:
         template: SVG template filename relative to `ASSETS_DIR`.
         outputs: `(output_filename, inject_background)` pairs written to
             `DOCS_DIR / subdir`.
-        resolver: Callable returning `{placeholder: value}` for this style.
+        resolvers: `{placeholder: callable}` for this style. Only placeholders
+            a template references are resolved; `{{link.<key>.url|display}}`
+            needs no entry (see `resolve_placeholders`).
         background: Background SVG filename in the style subdir; empty if unused.
         subdir: Subdirectory under `DOCS_DIR` for outputs and background.
         extra_markers: `{marker_comment: callable}` for style-specific SVG
-            injections beyond the shared Grid + Legend markers.
-        needs_steam: Whether this style's resolver reads Steam data from the
-            context. `main()` skips the Steam API call when no active style
-            has this set.
+            injections beyond the shared Grid + Legend markers; only called
+            when the template contains the marker. Large content may be
+            returned as an iterable of chunks (see `MarkerGenerator`).
         index_template: Optional HTML template filename under `ASSETS_DIR`;
-            rendered with shared placeholders and written to
+            rendered with the same resolvers and written to
             `DOCS_DIR / subdir / index.html`.
     """
 
     template: str
     outputs: list[tuple[str, bool]]
-    resolver: Callable[[CardContext], dict[str, str]]
+    resolvers: dict[str, Resolver]
     background: str = ""
     subdir: str = ""
-    extra_markers: dict[str, Callable[[CardContext], str]] = field(default_factory=dict)
-    needs_steam: bool = False
+    extra_markers: dict[str, MarkerGenerator] = field(default_factory=dict)
     index_template: str = ""
 
 
 # ── Registry ───────────────────────────────────────────────────────────────────
 
-CARD_STYLES: dict[str, CardStyle] = {}
+# Entry-point group installed packages add card styles under; each entry
+# point names a `CardStyle` object, e.g. `neon = "neon_card:STYLE"`.
+CARD_STYLE_ENTRY_POINT_GROUP = "profile_card.cards"
+
+
+@dataclass(frozen=True)
+class StyleDescriptor:
+    """Where a card style lives, known without importing it.
+
+    Attributes:
+        name: Style name (`--style`, `config.active_style`).
+        target: `"module:attribute"` path of the `CardStyle` object.
+        subdir: The style's `CardStyle.subdir`; empty if only known once
+            loaded (entry-point plugins).
+        primary_output: Filename of the style's first output (the one README
+            links to); empty if only known once loaded.
+    """
+
+    name: str
+    target: str
+    subdir: str = ""
+    primary_output: str = ""
+
+    def load(self) -> CardStyle:
+        """Import the style's module and return its `CardStyle`."""
+        module, _, attribute = self.target.partition(":")
+        style: object = importlib.import_module(module)
+        for part in attribute.split("."):
+            style = getattr(style, part)
+        if not isinstance(style, CardStyle):
+            raise TypeError(
+                f"Card style '{self.name}' ({self.target}) is not a CardStyle."
+            )
+        if self.primary_output and (
+            style.subdir != self.subdir or style.outputs[0][0] != self.primary_output
+        ):
+            raise ValueError(
+                f"Card style '{self.name}' doesn't match its descriptor: "
+                f"{style.subdir}/{style.outputs[0][0]} != "
+                f"{self.subdir}/{self.primary_output}"
+            )
+        return style
+
+
+BUILTIN_CARD_STYLES = (
+    StyleDescriptor(
+        "glass",
+        "profile_card.cards.glass:STYLE",
+        subdir="glass",
+        primary_output="profile-card.glass.svg",
+    ),
+    StyleDescriptor(
+        "man",
+        "profile_card.cards.man:STYLE",
+        subdir="man",
+        primary_output="profile-card.man-page.svg",
+    ),
+)
+
+
+class StyleRegistry(Mapping[str, CardStyle]):
+    """Card styles by name, each imported on first lookup.
+
+    Built-in descriptors are known up front; installed entry points are only
+    looked up for a name that isn't known yet or when iterating every style,
+    so selecting built-in styles imports neither `importlib.metadata` nor
+    the other styles' modules.
+    """
+
+    def __init__(self, descriptors: Iterable[StyleDescriptor], group: str) -> None:
+        """Know `descriptors` now; discover `group` entry points when needed."""
+        self._descriptors = {d.name: d for d in descriptors}
+        self._group = group
+        self._styles: dict[str, CardStyle] = {}
+        self._discovered = False
+
+    def _discover(self) -> None:
+        """Add installed entry points once; known names take precedence."""
+        if self._discovered:
+            return
+        self._discovered = True
+        # Imported on use: importlib.metadata costs ~10 ms of startup.
+        from importlib.metadata import entry_points
+
+        for entry in entry_points(group=self._group):
+            if entry.name in self._descriptors or entry.name in self._styles:
+                logger.warning(
+                    "Card style '%s' from %s is already defined; ignored",
+                    entry.name,
+                    entry.value,
+                )
+                continue
+            self._descriptors[entry.name] = StyleDescriptor(entry.name, entry.value)
+
+    def register(self, name: str, style: CardStyle) -> None:
+        """Add `style` under `name`; raise `ValueError` on duplicate."""
+        if name in self:
+            raise ValueError(f"Card style '{name}' is already registered.")
+        self._styles[name] = style
+
+    def describe(self, name: str) -> StyleDescriptor:
+        """Return style `name`'s descriptor, importing it only if incomplete.
+
+        Raises `KeyError` for an unknown style.
+        """
+        if name not in self:
+            raise KeyError(name)
+        descriptor = self._descriptors.get(name)
+        if descriptor is not None and descriptor.primary_output:
+            return descriptor
+        style = self[name]
+        return StyleDescriptor(
+            name,
+            descriptor.target if descriptor else "",
+            style.subdir,
+            style.outputs[0][0],
+        )
+
+    def __getitem__(self, name: str) -> CardStyle:
+        """Return style `name`, importing its module on first use."""
+        style = self._styles.get(name)
+        if style is not None:
+            return style
+        if name not in self._descriptors:
+            self._discover()
+        descriptor = self._descriptors.get(name)
+        if descriptor is None:
+            raise KeyError(name)
+        style = self._styles[name] = descriptor.load()
+        return style
+
+    def __contains__(self, name: object) -> bool:
+        """Whether `name` is a style, without importing it."""
+        if name in self._styles or name in self._descriptors:
+            return True
+        self._discover()
+        return name in self._descriptors
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate all style names, built-ins first."""
+        self._discover()
+        return iter({**self._descriptors, **self._styles})
+
+    def __len__(self) -> int:
+        """Number of styles, including installed plugins."""
+        return sum(1 for _ in self)
+
+
+CARD_STYLES = StyleRegistry(BUILTIN_CARD_STYLES, CARD_STYLE_ENTRY_POINT_GROUP)
 
 
 def register(name: str, style: CardStyle) -> None:
     """Add `style` to `CARD_STYLES` under `name`; raise `ValueError` on duplicate."""
-    if name in CARD_STYLES:
-        raise ValueError(f"Card style '{name}' is already registered.")
-    CARD_STYLES[name] = style
+    CARD_STYLES.register(name, style)
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
@@ -157,31 +349,61 @@ def format_years_active(first_commit: str | None) -> str:
     return f"{mos} mo"
 
 
-def common_github_placeholders(data: ContributionData) -> dict[str, str]:
-    """Atomic GitHub placeholders every card reads from ContributionData."""
-    return {
-        "{{gh.total}}": f"{data['total_contributions']:,}🌟",
-        "{{gh.streak}}": f"{data['current_streak']}🔥",
-        "{{gh.longest.count}}": f"{data['longest_streak']}🏆",
-        "{{gh.longest.from}}": format_date(data["longest_streak_start"]),
-        "{{gh.longest.to}}": format_date(data["longest_streak_end"]),
-    }
+# ── Placeholder Resolvers ─────────────────────────────────────────────────────
+
+# Atomic GitHub placeholders every card reads from `ContributionData`.
+GITHUB_RESOLVERS: dict[str, Resolver] = {
+    "{{gh.total}}": lambda ctx: f"{ctx.data['total_contributions']:,}🌟",
+    "{{gh.streak}}": lambda ctx: f"{ctx.data['current_streak']}🔥",
+    "{{gh.longest.count}}": lambda ctx: f"{ctx.data['longest_streak']}🏆",
+    "{{gh.longest.from}}": lambda ctx: format_date(ctx.data["longest_streak_start"]),
+    "{{gh.longest.to}}": lambda ctx: format_date(ctx.data["longest_streak_end"]),
+    "{{heatmap.range}}": lambda ctx: ctx.heatmap_range.describe(ctx.raw_counts),
+}
 
+# Atomic placeholders sourced from `config.json` (user + Steam ID). Links are
+# resolved by pattern in `resolve_placeholders`.
+SITE_RESOLVERS: dict[str, Resolver] = {
+    "{{user.name}}": lambda ctx: ctx.config["user"]["name"],
+    "{{user.name.upper}}": lambda ctx: ctx.config["user"]["name"].upper(),
+    "{{user.name.title}}": lambda ctx: ctx.config["user"]["name"].title(),
+    "{{user.display}}": lambda ctx: ctx.config["user"]["display"],
+    "{{st.id}}": lambda ctx: ctx.config["steam_id"],
+}
 
-def common_site_placeholders(config: Config) -> dict[str, str]:
-    """Atomic placeholders sourced from `config.json` (user + links + Steam ID)."""
-    name = config["user"]["name"]
-    result: dict[str, str] = {
-        "{{user.name}}": name,
-        "{{user.name.upper}}": name.upper(),
-        "{{user.name.title}}": name.title(),
-        "{{user.display}}": config["user"]["display"],
-        "{{st.id}}": config["steam_id"],
-    }
-    for key, link in config["links"].items():
-        result[f"{{{{link.{key}.url}}}}"] = link["url"]
-        result[f"{{{{link.{key}.display}}}}"] = link["display"]
-    return result
+
+def resolve_placeholders(
+    names: Iterable[str], resolvers: Mapping[str, Resolver], ctx: CardContext
+) -> dict[str, str]:
+    """Compute values for just `names`; names nothing can resolve are omitted.
+
+    `{{link.<key>.url}}` / `{{link.<key>.display}}` resolve from
+    `config["links"]` and `{{heatmap.shift|stretch.<n>}}` from the heatmap
+    layout when `resolvers` has no explicit entry.
+    """
+    values: dict[str, str] = {}
+    links = ctx.config["links"]
+    for name in names:
+        fn = resolvers.get(name)
+        if fn is not None:
+            with span("resolver", placeholder=name):
+                values[name] = fn(ctx)
+            continue
+        match = _LINK_PLACEHOLDER_RE.fullmatch(name)
+        if match and match[1] in links:
+            link = links[match[1]]
+            values[name] = link["url"] if match[2] == "url" else link["display"]
+        elif match := _HEATMAP_GROW_PLACEHOLDER_RE.fullmatch(name):
+            values[name] = _heatmap_grow(match[1], float(match[2]), ctx)
+    return values
+
+
+def _heatmap_grow(kind: str, value: float, ctx: CardContext) -> str:
+    """Resolve `{{heatmap.<kind>.<value>}}` (see `_HEATMAP_GROW_PLACEHOLDER_RE`)."""
+    grown = value + ctx.heatmap_layout.extra_height
+    if kind == "shift":
+        return f"{round(grown, 2):g}"
+    return f"{round(grown / value, 4):g}" if value else "1"
 
 
 def read_background_fragment(style_dir: Path, bg_file: str) -> str:
@@ -198,48 +420,88 @@ def read_background_fragment(style_dir: Path, bg_file: str) -> str:
 # ── SVG Generators (shared across cards) ──────────────────────────────────────
 
 
-def calculate_cell_dimensions(
-    grid_width: int, weeks: int = HEATMAP_WEEKS
-) -> tuple[float, float]:
-    """Return `(cell_size, cell_spacing)` fitting `weeks` columns in `grid_width`."""
-    gap_total = grid_width * GRID_SPACING_RATIO
-    cell_size = (grid_width - gap_total) / weeks
-    cell_spacing = gap_total / (weeks - 1)
-    return round(cell_size, 2), round(cell_spacing, 2)
-
-
 def create_svg_grid_with_heatmap(
-    levels: dict[str, int],
-    raw_counts: dict[str, int],
+    levels: ContributionSeries,
+    raw_counts: ContributionSeries,
     grid_width: int = 794,
+    compact: bool = False,
 ) -> str:
-    """Render the heatmap as `<rect>` elements preceded by the Grid marker comment."""
-    cell_size, cell_spacing = calculate_cell_dimensions(grid_width)
-
-    entries = list(levels.items())[-HEATMAP_CELLS:]
-    svg_parts = ["<!-- Contribution Grid -->"]
-
-    x, y = 0.0, 0.0
-    for index, (date, level) in enumerate(entries):
-        color = CONTRIBUTION_COLORS[level]
-        count = raw_counts.get(date, 0)
-        svg_parts.append(
-            f'<rect class="grid-cell" x="{x}" y="{y}" '
-            f'width="{cell_size}" height="{cell_size}" '
-            f'fill="url(#{color})" stroke="url(#{color}-stroke)" '
-            f'rx="2" title="{date}: {count}"/>'
+    """Return `iter_svg_grid_with_heatmap`'s chunks joined into one string."""
+    return "".join(iter_svg_grid_with_heatmap(levels, raw_counts, grid_width, compact))
+
+
+def iter_svg_grid_with_heatmap(
+    levels: ContributionSeries,
+    raw_counts: ContributionSeries,
+    grid_width: int = 794,
+    compact: bool = False,
+) -> Iterator[str]:
+    """Yield the heatmap cells preceded by the Grid marker comment, line by line.
+
+    Every day of `levels` (the heatmap window) gets a cell placed by
+    `heatmap_layout`. The default encoding is one self-contained `<rect>` per
+    cell. `compact` defines the cell shape once and emits one `<use>` per
+    cell inside per-level `<g>` groups that carry the shared fill and stroke,
+    with coordinates rounded to 2 decimals — same rendering and tooltips,
+    roughly half the bytes. Stacked multi-year layouts are always compact.
+    Every chunk after the first starts with its newline.
+    """
+    layout = heatmap_layout(levels, grid_width)
+    compact = compact or layout.stacked
+    cell_size = layout.cell_size
+    counts_offset = levels.start - raw_counts.start
+    counts = raw_counts.values
+    yield "<!-- Contribution Grid -->"
+    level_cells: dict[int, list[str]] = {level: [] for level in CONTRIBUTION_COLORS}
+
+    for band in layout.bands:
+        for ordinal in range(band.first, band.end):
+            index = ordinal - levels.start
+            level = levels.values[index]
+            x, y = layout.position(band, ordinal)
+            day = date.fromordinal(ordinal)
+            count_index = counts_offset + index
+            count = counts[count_index] if 0 <= count_index < len(counts) else 0
+            if compact:
+                level_cells[level].append(
+                    f'\n<use class="grid-cell" href="#{COMPACT_CELL_ID}" '
+                    f'x="{round(x, 2):g}" y="{round(y, 2):g}" title="{day}: {count}"/>'
+                )
+            else:
+                color = CONTRIBUTION_COLORS[level]
+                yield (
+                    f'\n<rect class="grid-cell" x="{x}" y="{y}" '
+                    f'width="{cell_size}" height="{cell_size}" '
+                    f'fill="url(#{color})" stroke="url(#{color}-stroke)" '
+                    f'rx="2" title="{day}: {count}"/>'
+                )
+
+    if compact:
+        yield (
+            f'\n<defs><rect id="{COMPACT_CELL_ID}" '
+            f'width="{cell_size}" height="{cell_size}" rx="2"/></defs>'
         )
-        y += cell_size + cell_spacing
-        if (index + 1) % HEATMAP_DAYS_PER_WEEK == 0:
-            y = 0.0
-            x += cell_size + cell_spacing
+        for level, cells in level_cells.items():
+            if not cells:
+                continue
+            color = CONTRIBUTION_COLORS[level]
+            yield f'\n<g fill="url(#{color})" stroke="url(#{color}-stroke)">'
+            yield from cells
+            yield "\n</g>"
 
-    return "\n".join(svg_parts)
 
+def create_svg_legend(
+    levels: ContributionSeries | None = None, grid_width: int = 794
+) -> str:
+    """Render the colour-scale legend; `grid_width` must match the grid's.
 
-def create_svg_legend(grid_width: int = 794) -> str:
-    """Render the colour-scale legend; `grid_width` must match the grid's."""
-    cell_size, _ = calculate_cell_dimensions(grid_width)
+    Swatches match the cells of the heatmap window `levels` (classic 52-week
+    cells without one).
+    """
+    if levels is None:
+        cell_size, _ = calculate_cell_dimensions(grid_width)
+    else:
+        cell_size = heatmap_layout(levels, grid_width).cell_size
 
     parts = ["<!-- Contribution Grid Legend -->"]
     for level, label in LEGEND_LABELS.items():
@@ -262,43 +524,90 @@ def create_svg_legend(grid_width: int = 794) -> str:
     return "\n".join(parts)
 
 
+def _month_columns(levels: ContributionSeries, layout: HeatmapLayout) -> dict[str, int]:
+    """Map month abbreviations to the column where each month starts.
+
+    Stacked bands share one column grid, so months come from the full
+    Monday-aligned calendar year of the first band rather than its visible
+    days. A single band labels each new month at its first visible column;
+    a month seen twice keeps its later column.
+    """
+    band = layout.bands[0]
+    if layout.stacked:
+        year = date.fromordinal(band.first).year
+        return {
+            abbr: (date(year, month, 1).toordinal() - band.origin)
+            // HEATMAP_DAYS_PER_WEEK
+            for month, abbr in enumerate(MONTH_ABBR, start=1)
+        }
+    columns: dict[str, int] = {}
+    prev_month: int | None = None
+    for col in range(layout.columns):
+        ordinal = max(band.origin + col * HEATMAP_DAYS_PER_WEEK, band.first)
+        if ordinal >= band.end:
+            break
+        month = date.fromordinal(ordinal).month
+        if month != prev_month:
+            columns[MONTH_ABBR[month - 1]] = col
+            prev_month = month
+    return columns
+
+
+def _spaced(positions: dict[str, float], min_spacing: float) -> dict[str, float]:
+    """Drop labels closer than `min_spacing` to the last kept one, left to right.
+
+    The surviving labels keep their order in `positions`.
+    """
+    kept: set[str] = set()
+    last: float | None = None
+    for label, x in sorted(positions.items(), key=lambda item: item[1]):
+        if last is None or x - last >= min_spacing:
+            kept.add(label)
+            last = x
+    return {label: x for label, x in positions.items() if label in kept}
+
+
 def create_svg_grid_labels(
-    levels: dict[str, int],
+    levels: ContributionSeries,
     grid_width: int = 794,
 ) -> str:
-    """Render day-of-week + month axis labels; `grid_width` must match the grid's.
+    """Render axis labels for the heatmap window `levels`; `grid_width` must match.
 
-    Day labels (Mon/Wed/Fri) pick their row from the weekday of the first visible
-    date. Month labels sit at the first column of each new month in the window.
+    A single band gets day labels (Mon/Wed/Fri), on rows picked from the
+    weekday of the first visible date, and month labels at the first column
+    of each new month. Stacked yearly bands get a year label per band and
+    month labels for the calendar year shared by every band's columns.
+    Month labels closer than `MONTH_LABEL_MIN_SPACING` are dropped.
     """
-    cell_size, cell_spacing = calculate_cell_dimensions(grid_width)
-    step = cell_size + cell_spacing
-
-    entries = list(levels.items())[-HEATMAP_CELLS:]
-    if not entries:
-        return "<!-- Contribution Grid Labels -->"
-
+    layout = heatmap_layout(levels, grid_width)
     parts = ["<!-- Contribution Grid Labels -->"]
+    if not layout.bands:
+        return parts[0]
+    cell_size = layout.cell_size
+    step = cell_size + layout.cell_spacing
+
+    if layout.stacked:
+        for band in layout.bands:
+            y = round(band.y + layout.band_height / 2 + 3.5, 1)
+            parts.append(
+                f'<text class="mono-sm" x="-10" y="{y}" '
+                f'text-anchor="end">{band.label}</text>'
+            )
+    else:
+        first_weekday = date.fromordinal(levels.start).weekday()  # Mon=0
+        for target_weekday, label in HEATMAP_ROW_LABELS:
+            row = (target_weekday - first_weekday) % 7
+            y = round(row * step + cell_size * 0.5 + 3.5, 1)
+            parts.append(
+                f'<text class="mono-sm" x="-10" y="{y}" '
+                f'text-anchor="end">{label}</text>'
+            )
 
-    first_weekday = datetime.fromisoformat(entries[0][0]).weekday()  # Mon=0
-    for target_weekday, label in HEATMAP_ROW_LABELS:
-        row = (target_weekday - first_weekday) % 7
-        y = round(row * step + cell_size * 0.5 + 3.5, 1)
-        parts.append(
-            f'<text class="mono-sm" x="-10" y="{y}" text-anchor="end">{label}</text>'
-        )
-
-    month_positions: dict[str, float] = {}
-    prev_month: int | None = None
-    for col in range(HEATMAP_WEEKS):
-        entry_idx = col * HEATMAP_DAYS_PER_WEEK
-        if entry_idx >= len(entries):
-            break
-        month = int(entries[entry_idx][0][5:7])
-        if month != prev_month:
-            month_positions[MONTH_ABBR[month - 1]] = round(col * step, 1)
-            prev_month = month
-    for abbr, x in month_positions.items():
+    month_positions = {
+        abbr: round(col * step, 1)
+        for abbr, col in _month_columns(levels, layout).items()
+    }
+    for abbr, x in _spaced(month_positions, MONTH_LABEL_MIN_SPACING).items():
         parts.append(f'<text class="mono-sm" x="{x}" y="-4">{abbr}</text>')
 
     return "\n".join(parts)
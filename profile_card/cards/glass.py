@@ -1,33 +1,19 @@
-"""Glass-style profile card. Registers on import."""
+"""Glass-style profile card, loaded by name from `CARD_STYLES`."""
 
 from profile_card.cards._shared import (
-    CardContext,
+    GITHUB_RESOLVERS,
+    SITE_RESOLVERS,
     CardStyle,
-    common_github_placeholders,
-    common_site_placeholders,
-    register,
 )
 
-
-def _resolve_placeholders(ctx: CardContext) -> dict[str, str]:
-    """Placeholder substitutions for the glass card template."""
-    return {
-        **common_github_placeholders(ctx.data),
-        **common_site_placeholders(ctx.config),
-    }
-
-
-register(
-    "glass",
-    CardStyle(
-        template="profile-card.glass.template.svg",
-        outputs=[
-            ("profile-card.glass.svg", True),
-            ("profile-card.glass-no-background.svg", False),
-        ],
-        background="background.glass.svg",
-        subdir="glass",
-        resolver=_resolve_placeholders,
-        index_template="profile-card.glass.index.template.html",
-    ),
+STYLE = CardStyle(
+    template="profile-card.glass.template.svg",
+    outputs=[
+        ("profile-card.glass.svg", True),
+        ("profile-card.glass-no-background.svg", False),
+    ],
+    background="background.glass.svg",
+    subdir="glass",
+    resolvers={**GITHUB_RESOLVERS, **SITE_RESOLVERS},
+    index_template="profile-card.glass.index.template.html",
 )
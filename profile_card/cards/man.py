@@ -1,17 +1,19 @@
-"""Man-page-style profile card. Registers on import.
+"""Man-page-style profile card, loaded by name from `CARD_STYLES`.
 
-Opts into the Steam prerequisite fetch via `needs_steam=True` and adds an
+Adds GitHub profile + Steam placeholders on top of the shared resolvers (the
+Steam fetch runs only because the template references `{{st.game}}`) and an
 `extra_markers` entry for heatmap axis labels (unused by the glass card).
 """
 
 from profile_card.cards._shared import (
+    GITHUB_RESOLVERS,
+    SITE_RESOLVERS,
+    STEAM_GAME_PLACEHOLDER,
     CardContext,
     CardStyle,
-    common_github_placeholders,
-    common_site_placeholders,
+    Resolver,
     create_svg_grid_labels,
     format_years_active,
-    register,
 )
 
 
@@ -20,32 +22,25 @@ def _grid_labels(ctx: CardContext) -> str:
     return create_svg_grid_labels(ctx.levels)
 
 
-def _resolve_placeholders(ctx: CardContext) -> dict[str, str]:
-    """Placeholder substitutions for the man-page card template."""
-    data = ctx.data
-    return {
-        **common_github_placeholders(data),
-        **common_site_placeholders(ctx.config),
-        "{{gh.first}}": data["first_commit"] or "unknown",
-        "{{gh.years}}": format_years_active(data["first_commit"]),
-        "{{gh.repos}}": str(data["public_repos"]),
-        "{{st.game}}": ctx.steam_game,
-    }
-
-
-register(
-    "man",
-    CardStyle(
-        template="profile-card.man-page.template.svg",
-        outputs=[
-            ("profile-card.man-page.svg", True),
-            ("profile-card.man-page-no-background.svg", False),
-        ],
-        background="background.man-page.svg",
-        subdir="man",
-        resolver=_resolve_placeholders,
-        extra_markers={"<!-- Contribution Grid Labels -->": _grid_labels},
-        needs_steam=True,
-        index_template="profile-card.man-page.index.template.html",
-    ),
+_RESOLVERS: dict[str, Resolver] = {
+    **GITHUB_RESOLVERS,
+    **SITE_RESOLVERS,
+    "{{gh.first}}": lambda ctx: ctx.data["first_commit"] or "unknown",
+    "{{gh.years}}": lambda ctx: format_years_active(ctx.data["first_commit"]),
+    "{{gh.repos}}": lambda ctx: str(ctx.data["public_repos"]),
+    STEAM_GAME_PLACEHOLDER: lambda ctx: ctx.steam_game,
+}
+
+
+STYLE = CardStyle(
+    template="profile-card.man-page.template.svg",
+    outputs=[
+        ("profile-card.man-page.svg", True),
+        ("profile-card.man-page-no-background.svg", False),
+    ],
+    background="background.man-page.svg",
+    subdir="man",
+    resolvers=_RESOLVERS,
+    extra_markers={"<!-- Contribution Grid Labels -->": _grid_labels},
+    index_template="profile-card.man-page.index.template.html",
 )
@@ -7,7 +7,7 @@ stay in env vars.
 
 import json
 from pathlib import Path
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 CONFIG_PATH = Path("config.json")
 
@@ -27,15 +27,51 @@ class User(TypedDict):
 
 
 class Config(TypedDict):
-    """Top-level shape of `config.json`."""
+    """Top-level shape of `config.json`.
+
+    `heatmap_range` is a spec for `profile_card.heatmap.parse_heatmap_range`
+    (default: the last 52 weeks).
+    """
 
     user: User
     links: dict[str, Link]
     steam_id: str
     active_style: str
+    heatmap_range: NotRequired[str]
 
 
 def load_config() -> Config:
     """Load and parse `config.json` from the current working directory."""
     raw: Config = json.loads(CONFIG_PATH.read_text(encoding="utf-8"))
     return raw
+
+
+def load_roster(path: Path, base: Config) -> list[Config]:
+    """Load a batch roster: a JSON list of `config.json`-shaped user entries.
+
+    Each entry needs `user`; `links` defaults to `{}` and `steam_id` to `""`
+    (Steam skipped) and `heatmap_range` to `base`'s. `active_style` is taken
+    from `base`. Raises `ValueError` on a non-list roster or duplicate
+    usernames.
+    """
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(entries, list):
+        raise ValueError(f"Roster {path} must be a JSON list of user entries.")
+    roster: list[Config] = []
+    seen: set[str] = set()
+    for entry in entries:
+        name = entry["user"]["name"]
+        if name.lower() in seen:
+            raise ValueError(f"Roster {path} lists user '{name}' more than once.")
+        seen.add(name.lower())
+        user: Config = {
+            "user": entry["user"],
+            "links": entry.get("links", {}),
+            "steam_id": entry.get("steam_id", ""),
+            "active_style": base["active_style"],
+        }
+        heatmap_range = entry.get("heatmap_range", base.get("heatmap_range"))
+        if heatmap_range is not None:
+            user["heatmap_range"] = heatmap_range
+        roster.append(user)
+    return roster
@@ -1,29 +1,64 @@
 """Network fetchers for GitHub contributions and Steam activity.
 
 Owns all external I/O plus the pure processing helpers that operate on fetch
-output (`calculate_streaks`, `map_contributions_to_levels`).
+output (`map_contributions_to_levels`); stats come from `profile_card.stats`.
 
 Non-obvious invariants:
-    - `_SESSION` is shared by every outbound call and retries on 429 + 5xx.
+    - One session (`_session()`) is shared by every outbound call and retries
+      on 5xx. 429 is not retried there: `RateLimitScheduler` sees it at once
+      and waits as long as GitHub asks. The session, and `requests` itself,
+      are only loaded on first network use. Requests may run on worker
+      threads (chunk batches, batch-mode users); its connection pool holds
+      `HTTP_POOL_MAXSIZE` connections. Its transport can be swapped
+      (`use_transport`) to record or replay traffic.
+    - With a `HistoryStore`, only the trailing `HISTORY_REFRESH_DAYS` plus any
+      never-fetched gaps hit the network; everything older is served from disk,
+      and stats resume from a checkpoint taken just before that window.
+    - Every GraphQL query goes through `GITHUB_RATE_LIMITER`, which paces
+      them against GitHub's reported budget and sleeps until the reset time
+      instead of letting a rate-limited query fail or burn retries.
+    - Steam answers are cached in the `HistoryStore`. An expired answer is
+      refreshed before use, and served as is if the refresh fails; long-lived
+      processes (`background=True`) serve it at once instead and refresh it
+      for the next call (stale-while-revalidate). Either way the requesting
+      thread is tracked: `wait_for_steam_revalidations` before closing the
+      store.
     - GraphQL responses are strictly validated: `errors` or missing `user`
       raises `RuntimeError` (no silent empty cards).
 """
 
+import heapq
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Any, TypedDict
-
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from profile_card.series import LEVEL_TYPECODE, ContributionSeries
+from profile_card.stats import StatsAccumulator, compute_stats, ordinal_to_iso
+from profile_card.store import HistoryStore
+from profile_card.tracing import span, worker_pool
+
+if TYPE_CHECKING:
+    # Imported on first network use (see `_session`): `requests` + `urllib3`
+    # dominate import time, and cache-only renders never need them.
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
 # ── Constants ──────────────────────────────────────────────────────────────────
 
-GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
-STEAM_RECENT_GAMES_URL = (
-    "https://api.steampowered.com/IPlayerService/GetRecentlyPlayedGames/v0001/"
+# Overridable via same-named env vars (GitHub Enterprise, local stand-in APIs).
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+STEAM_RECENT_GAMES_URL = os.getenv(
+    "STEAM_RECENT_GAMES_URL",
+    "https://api.steampowered.com/IPlayerService/GetRecentlyPlayedGames/v0001/",
 )
 
 CONTRIBUTIONS_START_DATE = datetime(2018, 7, 25, tzinfo=timezone.utc)
@@ -31,31 +66,62 @@ CONTRIBUTIONS_START_DATE = datetime(2018, 7, 25, tzinfo=timezone.utc)
 # GitHub GraphQL API caps `contributionsCollection` queries to one year.
 FETCH_CHUNK_SIZE = timedelta(days=365)
 
+# Trailing days refetched on every synced run — GitHub can still revise these
+# (late pushes with older author dates, timezone edges, repos made public).
+HISTORY_REFRESH_DAYS = 14
+
 # Also the slice size used when filtering fetched contributions for the heatmap.
 HEATMAP_WEEKS = 52
 
+# Upper bound on concurrent GraphQL chunk requests (1 = sequential).
+FETCH_MAX_WORKERS = 4
+
 REQUEST_TIMEOUT_SECONDS = 10
 
-# Applied to both GitHub and Steam.
+# Steam recent-games answers younger than this are served from the store.
+STEAM_CACHE_TTL_SECONDS = 3600.0
+
+# Applied to both GitHub and Steam. 429 is left out so GitHub rate limits
+# reach `RateLimitScheduler` instead of burning retries on blind backoff.
 HTTP_RETRY_TOTAL = 3
 HTTP_RETRY_BACKOFF = 1.0  # 1s, 2s, 4s between retries
-HTTP_RETRY_STATUSES: tuple[int, ...] = (429, 500, 502, 503, 504)
-
-# `repositories.totalCount` is fetched on every chunk but only used from the first.
-_GRAPHQL_QUERY = """
-query($username: String!, $from: DateTime!, $to: DateTime!) {
-  user(login: $username) {
+HTTP_RETRY_STATUSES: tuple[int, ...] = (500, 502, 503, 504)
+
+# Pooled keep-alive connections per host; covers batch users × chunk workers.
+HTTP_POOL_MAXSIZE = 16
+
+# Injected-failure status standing for a dropped connection (`--replay`).
+CONNECTION_ERROR_STATUS = 0
+
+# Points kept in hand: below this the scheduler sleeps until the reset time.
+GITHUB_RATE_LIMIT_RESERVE = 50
+# Below this many spare points, requests are spaced to last until the reset.
+GITHUB_RATE_LIMIT_PACE_BELOW = 500
+# Sleeps until reset allowed per query after a rate-limited (403/429) response.
+GITHUB_RATE_LIMIT_MAX_WAITS = 1
+# Wait after a 429 / RATE_LIMITED error that names no reset time (GitHub's
+# documented minimum for secondary rate limits).
+GITHUB_SECONDARY_RATE_LIMIT_WAIT = 60.0
+
+# Yearly windows per GraphQL document. GitHub's node limit only counts
+# paginated connections (`first`/`last`), and the calendar selects none, so
+# it never binds here; what does is the server-side timeout on expensive
+# documents. 10 years per document is an empirical cap that stays well
+# under it while keeping a cold run since 2018 to a single request.
+GRAPHQL_MAX_WINDOWS_PER_QUERY = 10
+
+_GRAPHQL_REPOS_FIELD = """
     repositories(ownerAffiliations: OWNER, privacy: PUBLIC) {
       totalCount
-    }
-    contributionsCollection(from: $from, to: $to) {
-      contributionCalendar {
-        weeks {
-          contributionDays {
-            date
-            contributionCount
-          }
-        }
+    }"""
+
+_GRAPHQL_CALENDAR_FRAGMENT = """
+fragment Calendar on ContributionsCollection {
+  contributionCalendar {
+    weeks {
+      contributionDays {
+        date
+        contributionCount
       }
     }
   }
@@ -67,9 +133,16 @@ query($username: String!, $from: DateTime!, $to: DateTime!) {
 
 
 class ContributionData(TypedDict):
-    """Contribution stats returned by `fetch_contributions_from_github`."""
+    """Contribution stats returned by `fetch_contributions_from_github`.
+
+    `contributions` holds the last `HEATMAP_WEEKS` weeks only; `history` is
+    the full gap-filled history the stats were computed from, as of the ISO
+    day `as_of`, for heatmaps over other ranges.
+    """
 
-    contributions: dict[str, int]
+    contributions: ContributionSeries
+    history: ContributionSeries
+    as_of: str
     total_contributions: int
     current_streak: int
     longest_streak: int
@@ -79,38 +152,233 @@ class ContributionData(TypedDict):
     public_repos: int
 
 
-class StreakData(TypedDict):
-    """Streak stats returned by `calculate_streaks`."""
-
-    current_streak: int
-    longest_streak: int
-    longest_streak_start: str | None
-    longest_streak_end: str | None
-
-
 # ── HTTP Session ───────────────────────────────────────────────────────────────
 
 
-def _make_session() -> requests.Session:
-    """Build a `requests.Session` that retries 429 + 5xx with exponential backoff.
+def http_retry_policy() -> "Retry":
+    """Return the retry policy for outbound requests: 5xx, exponential backoff.
 
     POST is retried alongside GET — safe here because the GraphQL query is read-only.
     """
-    session = requests.Session()
-    retry = Retry(
+    from urllib3.util.retry import Retry
+
+    return Retry(
         total=HTTP_RETRY_TOTAL,
         backoff_factor=HTTP_RETRY_BACKOFF,
         status_forcelist=HTTP_RETRY_STATUSES,
         allowed_methods=("GET", "POST"),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+
+
+def _make_session() -> "requests.Session":
+    """Build a `requests.Session` on the default transport."""
+    import requests
+
+    session = requests.Session()
+    use_transport(None, session)
+    return session
+
+
+_SESSION: "requests.Session | None" = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _session() -> "requests.Session":
+    """Return the shared session, building it (and importing `requests`) once."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _make_session()
+    return _SESSION
+
+
+def use_transport(
+    adapter: "HTTPAdapter | None", session: "requests.Session | None" = None
+) -> None:
+    """Send every request of `session` (default: the shared one) through `adapter`.
+
+    `None` restores the default pooled, retrying `HTTPAdapter`; see
+    `profile_card.transport` for record/replay adapters.
+    """
+    if adapter is None:
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(
+            max_retries=http_retry_policy(), pool_maxsize=HTTP_POOL_MAXSIZE
+        )
+    session = session if session is not None else _session()
     session.mount("http://", adapter)
     session.mount("https://", adapter)
-    return session
 
 
-_SESSION = _make_session()
+# ── Rate Limiting ──────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class RateLimitBudget:
+    """Last known GitHub GraphQL rate-limit state; fields are None until seen.
+
+    Attributes:
+        limit: Points per window.
+        remaining: Points left, less the cost of queries sent since.
+        reset_at: Unix time the window resets.
+        cost: Points charged for the last query.
+    """
+
+    limit: int | None = None
+    remaining: int | None = None
+    reset_at: float | None = None
+    cost: int = 1
+
+
+class RateLimitScheduler:
+    """Paces and orders GitHub queries against the reported rate-limit budget.
+
+    `acquire` blocks until a query may be sent: waiters go in `priority`
+    order (lowest first), requests are spaced out once fewer than
+    `GITHUB_RATE_LIMIT_PACE_BELOW` spare points remain, and at the reserve it
+    sleeps until the reset time. `update` feeds it each response's
+    `X-RateLimit-*` headers and GraphQL `rateLimit` field; `pause` holds all
+    queries after a rate-limited response (e.g. for its `Retry-After`).
+    """
+
+    def __init__(
+        self,
+        reserve: int = GITHUB_RATE_LIMIT_RESERVE,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Start with an unknown budget, holding back `reserve` points."""
+        self.reserve = reserve
+        self._clock = clock
+        self._budget = RateLimitBudget()
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._logged_reset_at: float | None = None
+        self._waiting: list[tuple[float, int]] = []
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def budget(self) -> RateLimitBudget:
+        """Return the current budget snapshot."""
+        with self._cond:
+            return self._budget
+
+    def suggest_workers(self, wanted: int) -> int:
+        """Cap `wanted` concurrent queries by the spare budget (at least 1)."""
+        budget = self.budget()
+        if budget.remaining is None:
+            return max(1, wanted)
+        spare = (budget.remaining - self.reserve) // max(1, budget.cost)
+        return max(1, min(wanted, spare))
+
+    def acquire(self, priority: float = 0.0) -> None:
+        """Block until a query at `priority` may be sent, then charge for it."""
+        with self._cond:
+            self._seq += 1
+            ticket = (priority, self._seq)
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        delay = self._delay()
+                        if delay <= 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+                heapq.heappop(self._waiting)
+                self._charge()
+            finally:
+                self._cond.notify_all()
+
+    def update(
+        self, headers: Mapping[str, str], rate_limit: Mapping[str, Any] | None = None
+    ) -> None:
+        """Record the budget reported by one response (headers and/or body)."""
+        changes: dict[str, Any] = {}
+        if "X-RateLimit-Remaining" in headers:
+            changes["remaining"] = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Limit" in headers:
+                changes["limit"] = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Reset" in headers:
+                changes["reset_at"] = float(headers["X-RateLimit-Reset"])
+        if rate_limit:
+            changes["remaining"] = int(rate_limit["remaining"])
+            changes["cost"] = max(1, int(rate_limit.get("cost", 1)))
+            if "limit" in rate_limit:
+                changes["limit"] = int(rate_limit["limit"])
+            if rate_limit.get("resetAt"):
+                changes["reset_at"] = datetime.fromisoformat(
+                    rate_limit["resetAt"].replace("Z", "+00:00")
+                ).timestamp()
+        if not changes:
+            return
+        with self._cond:
+            self._budget = replace(self._budget, **changes)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every query for `seconds` from now; logs once per pause."""
+        with self._cond:
+            until = self._clock() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                logger.info("GitHub rate limited — pausing queries for %.0fs", seconds)
+            self._cond.notify_all()
+
+    def exhausted(self) -> bool:
+        """Whether the budget is down to the reserve until the next reset."""
+        with self._cond:
+            return self._delay_for_reset() > 0
+
+    def _delay_for_reset(self) -> float:
+        """Seconds left of a pause or, at the reserve, until reset (lock held)."""
+        return max(self._paused_until - self._clock(), self._budget_wait(), 0.0)
+
+    def _budget_wait(self) -> float:
+        """Seconds to wait for the reset if at the reserve, else 0 (lock held)."""
+        budget = self._budget
+        if budget.remaining is None or budget.remaining > self.reserve:
+            return 0.0
+        if budget.reset_at is None:
+            return 0.0
+        return max(0.0, budget.reset_at - self._clock())
+
+    def _delay(self) -> float:
+        """Seconds until the head-of-queue query may go out (lock held)."""
+        budget_wait = self._budget_wait()
+        if budget_wait > 0 and self._budget.reset_at != self._logged_reset_at:
+            self._logged_reset_at = self._budget.reset_at
+            logger.info(
+                "GitHub rate limit at reserve (%s left) — sleeping %.0fs until reset",
+                self._budget.remaining,
+                budget_wait,
+            )
+        reset_wait = self._delay_for_reset()
+        if reset_wait > 0:
+            return reset_wait + 1
+        budget = self._budget
+        now = self._clock()
+        if budget.reset_at is not None and now >= budget.reset_at:
+            self._budget = RateLimitBudget(limit=budget.limit, cost=budget.cost)
+        return max(0.0, self._next_slot - now)
+
+    def _charge(self) -> None:
+        """Deduct the expected cost and schedule the next pacing slot (lock held)."""
+        budget = self._budget
+        if budget.remaining is None:
+            return
+        remaining = budget.remaining - budget.cost
+        self._budget = replace(budget, remaining=remaining)
+        spare = remaining - self.reserve
+        if budget.reset_at is not None and 0 < spare < GITHUB_RATE_LIMIT_PACE_BELOW:
+            interval = (budget.reset_at - self._clock()) / (spare / budget.cost)
+            self._next_slot = self._clock() + max(0.0, interval)
+
+
+GITHUB_RATE_LIMITER = RateLimitScheduler()
 
 
 # ── GitHub ─────────────────────────────────────────────────────────────────────
@@ -128,152 +396,390 @@ def _parse_contribution_days(weeks: list[Any]) -> dict[str, int]:
     return contributions
 
 
-def _fetch_all_contributions(username: str, token: str) -> tuple[dict[str, int], int]:
-    """Paginate contributions since start date in `FETCH_CHUNK_SIZE` steps.
+def _chunk_windows(start: datetime, end: datetime) -> list[tuple[datetime, datetime]]:
+    """Split `[start, end)` into consecutive windows of at most `FETCH_CHUNK_SIZE`."""
+    windows: list[tuple[datetime, datetime]] = []
+    while start < end:
+        chunk_end = min(start + FETCH_CHUNK_SIZE, end)
+        windows.append((start, chunk_end))
+        start = chunk_end
+    return windows
 
-    Returns `(date → count, public_repos)`. Raises `RuntimeError` on GraphQL
-    errors or unexpected payloads so callers don't silently get empty data.
+
+def _build_contributions_query(windows: int, include_repos: bool) -> str:
+    """Build one GraphQL document with `windows` aliased calendar windows.
+
+    Window `i` is aliased `w{i}` and reads variables `$from{i}` / `$to{i}`.
+    `repositories.totalCount` is requested only when `include_repos` is set.
     """
-    all_contributions: dict[str, int] = {}
-    public_repos = 0
-    headers = {"Authorization": f"Bearer {token}"}
+    params = "".join(
+        f", $from{i}: DateTime!, $to{i}: DateTime!" for i in range(windows)
+    )
+    fields = "".join(
+        f"\n    w{i}: contributionsCollection(from: $from{i}, to: $to{i}) "
+        "{ ...Calendar }"
+        for i in range(windows)
+    )
+    repos = _GRAPHQL_REPOS_FIELD if include_repos else ""
+    return (
+        f"query($username: String!{params}) {{\n"
+        f"  rateLimit {{ cost remaining resetAt limit }}\n"
+        f"  user(login: $username) {{{repos}{fields}\n  }}\n}}\n"
+        f"{_GRAPHQL_CALENDAR_FRAGMENT}"
+    )
 
-    start = CONTRIBUTIONS_START_DATE
-    end = datetime.now(timezone.utc)
 
-    logger.info("Fetching contributions for '%s' since %s", username, start.date())
+def _batch_windows(
+    windows: list[tuple[datetime, datetime]],
+) -> list[list[tuple[datetime, datetime]]]:
+    """Group `windows` into batches of `GRAPHQL_MAX_WINDOWS_PER_QUERY`."""
+    size = GRAPHQL_MAX_WINDOWS_PER_QUERY
+    return [windows[i : i + size] for i in range(0, len(windows), size)]
 
-    while start < end:
-        chunk_end = min(start + FETCH_CHUNK_SIZE, end)
-        variables = {
-            "username": username,
-            "from": start.isoformat(),
-            "to": chunk_end.isoformat(),
-        }
-        logger.debug("Chunk: %s → %s", start.date(), chunk_end.date())
-
-        response = _SESSION.post(
-            GITHUB_GRAPHQL_URL,
-            json={"query": _GRAPHQL_QUERY, "variables": variables},
-            headers=headers,
-            timeout=REQUEST_TIMEOUT_SECONDS,
-        )
-        response.raise_for_status()
-        payload = response.json()
 
-        if payload.get("errors"):
-            raise RuntimeError(f"GraphQL errors: {payload['errors']}")
+def _retry_count(response: "requests.Response") -> int:
+    """Number of urllib3 retries spent on `response` (0 if unknown)."""
+    retries = getattr(response.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
 
-        user = payload.get("data", {}).get("user")
-        if not user:
-            raise RuntimeError(f"Unexpected API response: {payload}")
 
-        if public_repos == 0:
-            public_repos = user["repositories"]["totalCount"]
-        weeks = user["contributionsCollection"]["contributionCalendar"]["weeks"]
-        all_contributions.update(_parse_contribution_days(weeks))
+def _is_rate_limited(response: "requests.Response", payload: dict[str, Any]) -> bool:
+    """Whether GitHub rejected the query for rate limiting (HTTP or GraphQL)."""
+    if response.status_code in (403, 429):
+        return True
+    return any(e.get("type") == "RATE_LIMITED" for e in payload.get("errors") or [])
 
-        start = chunk_end
 
-    return all_contributions, public_repos
+def _rate_limit_wait(
+    response: "requests.Response", payload: dict[str, Any]
+) -> float | None:
+    """Seconds GitHub asks a rate-limited query to wait, or None if it doesn't say.
 
+    `Retry-After` (seconds or HTTP date) wins, then `X-RateLimit-Reset` once
+    `X-RateLimit-Remaining` is 0. A 429 or `RATE_LIMITED` error without
+    either waits `GITHUB_SECONDARY_RATE_LIMIT_WAIT`; a bare 403 doesn't wait.
+    """
+    headers = response.headers
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after).timestamp()
+            except (TypeError, ValueError):
+                pass
+            else:
+                return max(0.0, retry_at - time.time())
+    if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+        return max(0.0, float(headers["X-RateLimit-Reset"]) - time.time())
+    if response.status_code == 429 or any(
+        e.get("type") == "RATE_LIMITED" for e in payload.get("errors") or []
+    ):
+        return GITHUB_SECONDARY_RATE_LIMIT_WAIT
+    return None
 
-def fetch_contributions_from_github(username: str, token: str) -> ContributionData:
-    """Fetch all contributions, compute streaks + first-commit, slice 52 weeks."""
-    all_contributions, public_repos = _fetch_all_contributions(username, token)
 
-    cutoff = (
-        datetime.now(timezone.utc).date() - timedelta(weeks=HEATMAP_WEEKS)
-    ).isoformat()
-    recent_contributions = {
-        date: count for date, count in all_contributions.items() if date >= cutoff
-    }
+def _fetch_batch(
+    username: str,
+    headers: dict[str, str],
+    windows: list[tuple[datetime, datetime]],
+    include_repos: bool,
+) -> tuple[dict[str, int], int]:
+    """POST one aliased multi-window query; return `(date → count, repos)`.
+
+    `repos` is 0 unless `include_repos`. Raises `RuntimeError` on GraphQL
+    errors or unexpected payloads so callers don't silently get empty data.
+    """
+    variables = {"username": username}
+    for i, (start, end) in enumerate(windows):
+        variables[f"from{i}"] = start.isoformat()
+        variables[f"to{i}"] = end.isoformat()
+    logger.debug(
+        "Batch: %d window(s) %s → %s",
+        len(windows),
+        windows[0][0].date(),
+        windows[-1][1].date(),
+    )
 
-    streaks = calculate_streaks(all_contributions)
-    total = sum(all_contributions.values())
-    first_commit = min((d for d, c in all_contributions.items() if c > 0), default=None)
+    query = _build_contributions_query(len(windows), include_repos)
+    first_day = min(start for start, _ in windows)
+    last_day = max(end for _, end in windows)
+    for waits in range(GITHUB_RATE_LIMIT_MAX_WAITS + 1):
+        # Most recent windows first: they feed the refresh window and heatmap.
+        GITHUB_RATE_LIMITER.acquire(priority=-last_day.timestamp())
+        with span(
+            "graphql_chunk",
+            windows=len(windows),
+            first_day=first_day.date(),
+            last_day=last_day.date(),
+        ) as current:
+            response = _session().post(
+                GITHUB_GRAPHQL_URL,
+                json={"query": query, "variables": variables},
+                headers=headers,
+                timeout=REQUEST_TIMEOUT_SECONDS,
+            )
+            if current:
+                current.set(
+                    status=response.status_code,
+                    bytes=len(response.content),
+                    retries=_retry_count(response),
+                )
+        GITHUB_RATE_LIMITER.update(response.headers)
+        payload = response.json() if response.ok else {}
+        GITHUB_RATE_LIMITER.update({}, (payload.get("data") or {}).get("rateLimit"))
+        rate_limited = _is_rate_limited(response, payload)
+        if rate_limited and (wait := _rate_limit_wait(response, payload)) is not None:
+            GITHUB_RATE_LIMITER.pause(wait)
+        if waits == GITHUB_RATE_LIMIT_MAX_WAITS or not (
+            rate_limited and GITHUB_RATE_LIMITER.exhausted()
+        ):
+            break
+    response.raise_for_status()
+
+    if payload.get("errors"):
+        raise RuntimeError(f"GraphQL errors: {payload['errors']}")
+
+    user = payload.get("data", {}).get("user")
+    if not user:
+        raise RuntimeError(f"Unexpected API response: {payload}")
 
-    longest_range = (
-        f"{streaks['longest_streak_start']} → {streaks['longest_streak_end']}"
-        if streaks["longest_streak_start"] and streaks["longest_streak_end"]
-        else "N/A"
+    contributions: dict[str, int] = {}
+    for i in range(len(windows)):
+        weeks = user[f"w{i}"]["contributionCalendar"]["weeks"]
+        contributions.update(_parse_contribution_days(weeks))
+    repos = user["repositories"]["totalCount"] if include_repos else 0
+    return contributions, repos
+
+
+def _fetch_all_contributions(
+    username: str,
+    token: str,
+    windows: list[tuple[datetime, datetime]] | None = None,
+    workers: int = FETCH_MAX_WORKERS,
+) -> tuple[dict[str, int], int]:
+    """Fetch contributions for each `(from, to)` window, batched and concurrent.
+
+    `windows` defaults to the full history since `CONTRIBUTIONS_START_DATE` in
+    `FETCH_CHUNK_SIZE` steps. Windows are packed into aliased queries (see
+    `_batch_windows`) and up to `workers` batches run at once. Results merge in
+    window order regardless of completion order; `public_repos` is requested
+    by the first batch only. Returns `(date → count, public_repos)`; the first
+    failing batch's error propagates.
+    """
+    if windows is None:
+        windows = _chunk_windows(CONTRIBUTIONS_START_DATE, datetime.now(timezone.utc))
+    if not windows:
+        return {}, 0
+
+    headers = {"Authorization": f"Bearer {token}"}
+    batches = _batch_windows(windows)
+    workers = GITHUB_RATE_LIMITER.suggest_workers(
+        min(workers, FETCH_MAX_WORKERS, len(batches))
     )
+
     logger.info(
-        "Stats: total=%d repos=%d first=%s current=%d longest=%d (%s)",
-        total,
-        public_repos,
-        first_commit or "N/A",
-        streaks["current_streak"],
-        streaks["longest_streak"],
-        longest_range,
+        "Fetching contributions for '%s': %d window(s) in %d request(s), %d worker(s)",
+        username,
+        len(windows),
+        len(batches),
+        workers,
     )
 
-    return {
-        "contributions": recent_contributions,
-        "total_contributions": total,
-        "current_streak": streaks["current_streak"],
-        "longest_streak": streaks["longest_streak"],
-        "longest_streak_start": streaks["longest_streak_start"],
-        "longest_streak_end": streaks["longest_streak_end"],
-        "first_commit": first_commit,
-        "public_repos": public_repos,
-    }
+    def fetch(index: int) -> tuple[dict[str, int], int]:
+        return _fetch_batch(username, headers, batches[index], index == 0)
+
+    if workers == 1:
+        results = [fetch(i) for i in range(len(batches))]
+    else:
+        with worker_pool(workers) as pool:
+            results = list(pool.map(fetch, range(len(batches))))
+
+    all_contributions: dict[str, int] = {}
+    for chunk, _ in results:
+        all_contributions.update(chunk)
+    return all_contributions, results[0][1]
+
+
+def _day_start(day: date) -> datetime:
+    """Return midnight UTC at the start of `day`."""
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def _missing_ranges(
+    known: dict[str, int], start: date, end: date
+) -> list[tuple[date, date]]:
+    """Return `(first, last)` runs of days in `[start, end)` missing from `known`."""
+    ranges: list[tuple[date, date]] = []
+    run_start: date | None = None
+    day = start
+    one_day = timedelta(days=1)
+    while day < end:
+        if day.isoformat() in known:
+            if run_start is not None:
+                ranges.append((run_start, day - one_day))
+                run_start = None
+        elif run_start is None:
+            run_start = day
+        day += one_day
+    if run_start is not None:
+        ranges.append((run_start, end - one_day))
+    return ranges
+
+
+def _refresh_start(today: date) -> date:
+    """First day a synced run refetches; days before it are treated as final."""
+    return today - timedelta(days=HISTORY_REFRESH_DAYS)
+
+
+def _advance_checkpoint(
+    username: str, history: ContributionSeries, store: HistoryStore, today: date
+) -> StatsAccumulator:
+    """Load `username`'s stats checkpoint, feed it up to the refresh window, save it.
+
+    A checkpoint that doesn't fit `history` (e.g. `HISTORY_REFRESH_DAYS` was
+    lowered) is discarded and rebuilt from the start of the history.
+    """
+    frozen_end = _refresh_start(today).toordinal()
+    state = store.load_checkpoint(username)
+    acc = StatsAccumulator.from_state(state) if state else StatsAccumulator()
+    if acc.next_ordinal is not None and not (
+        history.start <= acc.next_ordinal <= frozen_end
+    ):
+        logger.info("Stats checkpoint for '%s' out of range — rebuilding", username)
+        acc = StatsAccumulator()
+    resumed_from = acc.next_ordinal
+    acc.feed_until(history, frozen_end)
+    store.save_checkpoint(username, acc.to_state())
+    logger.debug(
+        "Stats checkpoint: resumed from %s, now through %s",
+        ordinal_to_iso(resumed_from),
+        ordinal_to_iso(frozen_end - 1),
+    )
+    return acc
 
 
-def calculate_streaks(contributions: dict[str, int]) -> StreakData:
-    """Compute current/longest streaks over chronologically sorted dates.
+def _sync_contributions(
+    username: str, token: str, store: HistoryStore, workers: int
+) -> tuple[dict[str, int], int]:
+    """Bring `store` up to date for `username` and return its full history.
 
-    Today is excluded when it has zero contributions — the day may not be complete.
+    Refetches the trailing `HISTORY_REFRESH_DAYS` (always — it also carries
+    `public_repos`) plus any gap before it; older days come from disk. Days a
+    gap fetch didn't return are recorded as zero so they aren't refetched.
     """
-    today = datetime.now(timezone.utc).date()
-    today_str = today.isoformat()
-    if contributions.get(today_str) == 0:
-        logger.info(
-            "Excluding today (%s) from streak — zero contributions so far", today_str
+    known = store.load(username)
+    now = datetime.now(timezone.utc)
+    refresh_from = _refresh_start(now.date())
+
+    windows = [(_day_start(refresh_from), now)]
+    gap_days: list[str] = []
+    gaps = _missing_ranges(known, CONTRIBUTIONS_START_DATE.date(), refresh_from)
+    for first, last in gaps:
+        windows += _chunk_windows(
+            _day_start(first), _day_start(last + timedelta(days=1))
         )
-    active = {
-        d: c
-        for d, c in contributions.items()
-        if not (datetime.fromisoformat(d).date() == today and c == 0)
-    }
-    sorted_dates = sorted(active.keys(), key=lambda d: datetime.fromisoformat(d))
+        gap_days += [
+            (first + timedelta(days=i)).isoformat()
+            for i in range((last - first).days + 1)
+        ]
+    logger.info(
+        "History: %d cached day(s), %d gap(s), refreshing since %s",
+        len(known),
+        len(gaps),
+        refresh_from,
+    )
 
-    current_streak = 0
-    longest_streak = 0
-    longest_streak_start = None
-    longest_streak_end = None
-    streak_start = None
+    fetched, public_repos = _fetch_all_contributions(username, token, windows, workers)
+    for day_str in gap_days:
+        fetched.setdefault(day_str, 0)
+    store.save(username, fetched)
+    store.save_public_repos(username, public_repos)
 
-    for date_str in sorted_dates:
-        date = datetime.fromisoformat(date_str).date()
+    known.update(fetched)
+    return dict(sorted(known.items())), public_repos
 
-        if active[date_str] > 0:
-            if current_streak == 0:
-                streak_start = date
 
-            current_streak += 1
+def fetch_contributions_from_github(
+    username: str,
+    token: str,
+    store: HistoryStore | None = None,
+    workers: int = FETCH_MAX_WORKERS,
+) -> ContributionData:
+    """Fetch all contributions, compute stats in one pass, slice 52 weeks.
 
-            if current_streak > longest_streak:
-                longest_streak = current_streak
-                longest_streak_start = streak_start
-                longest_streak_end = date
-        else:
-            current_streak = 0
-            streak_start = None
+    With `store`, history is synced incrementally (see `_sync_contributions`);
+    without it, the full history is refetched. Up to `workers` chunk requests
+    run concurrently.
+    """
+    if store is not None:
+        all_contributions, public_repos = _sync_contributions(
+            username, token, store, workers
+        )
+    else:
+        all_contributions, public_repos = _fetch_all_contributions(
+            username, token, workers=workers
+        )
+
+    today = datetime.now(timezone.utc).date()
+    history = ContributionSeries.from_mapping(all_contributions)
+    checkpoint = (
+        _advance_checkpoint(username, history, store, today)
+        if store is not None
+        else None
+    )
+    return summarize_contributions(history, public_repos, today, checkpoint)
+
+
+def summarize_contributions(
+    history: ContributionSeries,
+    public_repos: int,
+    today: date,
+    checkpoint: StatsAccumulator | None = None,
+) -> ContributionData:
+    """Compute stats over the full `history` and slice the 52-week window.
+
+    The network-free half of `fetch_contributions_from_github`; `checkpoint`
+    is passed through to `compute_stats`.
+    """
+    recent_contributions = history.since(today - timedelta(weeks=HEATMAP_WEEKS))
+    with span("stats", days=len(history)):
+        stats = compute_stats(history, today, checkpoint)
+    longest_start = ordinal_to_iso(stats.longest_start)
+    longest_end = ordinal_to_iso(stats.longest_end)
+    first_commit = ordinal_to_iso(stats.first_commit)
+
+    longest_range = (
+        f"{longest_start} → {longest_end}" if longest_start and longest_end else "N/A"
+    )
+    logger.info(
+        "Stats: total=%d repos=%d first=%s current=%d longest=%d (%s)",
+        stats.total,
+        public_repos,
+        first_commit or "N/A",
+        stats.current_streak,
+        stats.longest_streak,
+        longest_range,
+    )
 
     return {
-        "current_streak": current_streak,
-        "longest_streak": longest_streak,
-        "longest_streak_start": (
-            longest_streak_start.isoformat() if longest_streak_start else None
-        ),
-        "longest_streak_end": (
-            longest_streak_end.isoformat() if longest_streak_end else None
-        ),
+        "contributions": recent_contributions,
+        "history": history,
+        "as_of": today.isoformat(),
+        "total_contributions": stats.total,
+        "current_streak": stats.current_streak,
+        "longest_streak": stats.longest_streak,
+        "longest_streak_start": longest_start,
+        "longest_streak_end": longest_end,
+        "first_commit": first_commit,
+        "public_repos": public_repos,
     }
 
 
-def map_contributions_to_levels(contributions: dict[str, int]) -> dict[str, int]:
+def map_contributions_to_levels(
+    contributions: ContributionSeries,
+) -> ContributionSeries:
     """Bucket raw counts into heatmap intensity levels 0–5."""
 
     def _count_to_level(count: int) -> int:
@@ -289,19 +795,19 @@ def map_contributions_to_levels(contributions: dict[str, int]) -> dict[str, int]
             return 4
         return 5
 
-    return {date: _count_to_level(count) for date, count in contributions.items()}
+    return contributions.map(_count_to_level, LEVEL_TYPECODE)
 
 
 # ── Steam ──────────────────────────────────────────────────────────────────────
 
 
-def fetch_currently_playing_from_steam(api_key: str, steam_id: str) -> str | None:
-    """Return the most-played game in the last two weeks, or None if unavailable.
+def _request_recent_steam_game(api_key: str, steam_id: str) -> str | None:
+    """Return the most-played recent game, or None if there is none.
 
-    Requires the Steam profile's game details to be set to Public.
+    Raises on request or response-shape failures.
     """
-    try:
-        response = _SESSION.get(
+    with span("steam_request"):
+        response = _session().get(
             STEAM_RECENT_GAMES_URL,
             params={
                 "key": api_key,
@@ -311,21 +817,123 @@ def fetch_currently_playing_from_steam(api_key: str, steam_id: str) -> str | Non
             },
             timeout=REQUEST_TIMEOUT_SECONDS,
         )
-        response.raise_for_status()
-        games = response.json().get("response", {}).get("games", [])
-        if games:
-            candidates = ", ".join(
-                f"{g.get('name', '?')} ({g.get('playtime_2weeks', 0)}m)" for g in games
-            )
-            chosen = str(games[0]["name"])
-            logger.info("Steam candidates: [%s] — chose: %s", candidates, chosen)
-            return chosen
+    response.raise_for_status()
+    games = response.json().get("response", {}).get("games", [])
+    if not games:
         logger.info("Steam: no recent games in last 2 weeks")
-    except (
-        requests.exceptions.RequestException,
-        ValueError,
-        KeyError,
-        IndexError,
-    ) as e:
+        return None
+    candidates = ", ".join(
+        f"{g.get('name', '?')} ({g.get('playtime_2weeks', 0)}m)" for g in games
+    )
+    chosen = str(games[0]["name"])
+    logger.info("Steam candidates: [%s] — chose: %s", candidates, chosen)
+    return chosen
+
+
+# `requests.RequestException` is an `OSError`; catching that keeps `requests`
+# out of this module's imports.
+_STEAM_ERRORS = (OSError, ValueError, KeyError, IndexError)
+
+# In-flight background revalidations by Steam ID (at most one per ID).
+_steam_revalidations: dict[str, threading.Thread] = {}
+_steam_revalidations_lock = threading.Lock()
+
+
+def _revalidate_steam_game(api_key: str, steam_id: str, store: HistoryStore) -> None:
+    """Refresh the stored Steam answer for `steam_id` on its claiming thread."""
+    try:
+        game = _request_recent_steam_game(api_key, steam_id)
+    except _STEAM_ERRORS as e:
+        logger.warning("Steam revalidation failed: %s — keeping cached value", e)
+    else:
+        store.save_steam_game(steam_id, game, time.time())
+    finally:
+        with _steam_revalidations_lock:
+            _steam_revalidations.pop(steam_id, None)
+
+
+def _claim_steam_revalidation(steam_id: str, thread: threading.Thread) -> bool:
+    """Register `thread` as revalidating `steam_id`; False if another one is."""
+    with _steam_revalidations_lock:
+        return _steam_revalidations.setdefault(steam_id, thread) is thread
+
+
+def _revalidate_steam_game_now(
+    api_key: str, steam_id: str, store: HistoryStore
+) -> None:
+    """Revalidate `steam_id` on this thread, or wait for the one already doing it.
+
+    The calling thread is tracked while it requests, so a fetch abandoned on
+    timeout is still awaited by `wait_for_steam_revalidations`.
+    """
+    if _claim_steam_revalidation(steam_id, threading.current_thread()):
+        _revalidate_steam_game(api_key, steam_id, store)
+        return
+    with _steam_revalidations_lock:
+        running = _steam_revalidations.get(steam_id)
+    if running is not None:
+        running.join()
+
+
+def _start_steam_revalidation(api_key: str, steam_id: str, store: HistoryStore) -> None:
+    """Revalidate `steam_id` on a background thread unless already running."""
+    thread = threading.Thread(
+        target=_revalidate_steam_game,
+        args=(api_key, steam_id, store),
+        name=f"steam-revalidate-{steam_id}",
+    )
+    if _claim_steam_revalidation(steam_id, thread):
+        thread.start()
+
+
+def wait_for_steam_revalidations(timeout: float | None = None) -> None:
+    """Block until background Steam revalidations finish.
+
+    Call before closing the `HistoryStore` they write to.
+    """
+    with _steam_revalidations_lock:
+        threads = list(_steam_revalidations.values())
+    for thread in threads:
+        if thread is not threading.current_thread():
+            thread.join(timeout)
+
+
+def fetch_currently_playing_from_steam(
+    api_key: str,
+    steam_id: str,
+    store: HistoryStore | None = None,
+    ttl: float = STEAM_CACHE_TTL_SECONDS,
+    background: bool = False,
+) -> str | None:
+    """Return the most-played game in the last two weeks, or None if unavailable.
+
+    Requires the Steam profile's game details to be set to Public. With a
+    `store`, an answer younger than `ttl` seconds is returned without a
+    request. An older one is refreshed first and returned unchanged if the
+    refresh fails; with `background`, it is returned at once while the
+    refresh updates the store for the next call (see
+    `wait_for_steam_revalidations`). One-shot runs leave `background` off,
+    since no later call would see the refreshed answer.
+    """
+    cached = store.load_steam_game(steam_id) if store is not None else None
+    if store is not None and cached is not None:
+        game, fetched_at = cached
+        age = time.time() - fetched_at
+        if age < ttl:
+            logger.info("Steam: cached (%.0fs old) — %s", age, game)
+            return game
+        logger.info("Steam: stale (%.0fs old), revalidating — %s", age, game)
+        if background:
+            _start_steam_revalidation(api_key, steam_id, store)
+            return game
+        _revalidate_steam_game_now(api_key, steam_id, store)
+        refreshed = store.load_steam_game(steam_id)
+        return refreshed[0] if refreshed is not None else game
+    try:
+        game = _request_recent_steam_game(api_key, steam_id)
+    except _STEAM_ERRORS as e:
         logger.warning("Steam API request failed: %s", e)
-    return None
+        return None
+    if store is not None:
+        store.save_steam_game(steam_id, game, time.time())
+    return game
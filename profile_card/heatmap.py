@@ -0,0 +1,280 @@
+"""Heatmap date ranges and calendar layout.
+
+A range spec (`config["heatmap_range"]` or `--heatmap-range`) picks which
+days of the full contribution history a card's heatmap shows;
+`heatmap_layout` places every day of that window on a calendar grid that
+fits the template's grid box.
+
+Specs: `52w` (default) for the last N weeks, `all` for the whole history,
+`2024` or `2018-2025` for calendar years, and `2024-03-01:2024-06-30` for
+dates, either side optional (history start / today).
+
+Non-obvious invariants:
+    - Windows are gap-filled (days without history are zero), so cells are
+      placed from day ordinals alone and any range renders.
+    - Windows up to `HEATMAP_MAX_BAND_WEEKS` weeks are one band whose rows
+      start at the window's first weekday — the classic 52-week card, with
+      the same cell sizes and float coordinates. Longer windows stack one
+      Monday-first band per calendar year, with cells sized to the grid
+      width; the grid then grows down by `extra_height`, which cards add to
+      everything below it (`{{heatmap.shift.<n>}}`).
+    - `Nw` windows end on the last synced day but never start before
+      `today - N weeks`.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import accumulate, repeat
+
+from profile_card.fetchers import HEATMAP_WEEKS
+from profile_card.series import ContributionSeries
+
+HEATMAP_DAYS_PER_WEEK = 7
+HEATMAP_CELLS = HEATMAP_WEEKS * HEATMAP_DAYS_PER_WEEK  # 364
+
+HEATMAP_DEFAULT_RANGE = f"{HEATMAP_WEEKS}w"
+
+# Longest window drawn as a single band; longer ones stack yearly bands.
+HEATMAP_MAX_BAND_WEEKS = 53
+
+# Empty space between stacked yearly bands, in cells.
+HEATMAP_BAND_GAP_CELLS = 1.0
+
+# Fraction of total grid width reserved for gaps between columns.
+GRID_SPACING_RATIO = 0.1
+
+_WEEKS_RE = re.compile(r"(\d+)w")
+_YEARS_RE = re.compile(r"(\d{4})(?:-(\d{4}))?")
+
+
+# ── Ranges ─────────────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class HeatmapRange:
+    """A parsed range spec; `window` resolves it against a history.
+
+    Attributes:
+        spec: The spec as given.
+        weeks: Trailing week count of an `Nw` spec, else None.
+        first: First day, or None for the history's first day.
+        last: Last day, or None for today (later days are clipped to today).
+        years: `(first, last)` calendar years of a year spec, else None.
+    """
+
+    spec: str
+    weeks: int | None = None
+    first: date | None = None
+    last: date | None = None
+    years: tuple[int, int] | None = None
+
+    def window(self, history: ContributionSeries, today: date) -> ContributionSeries:
+        """Return the gap-filled days of `history` this range covers."""
+        if self.weeks is not None:
+            days = self.weeks * HEATMAP_DAYS_PER_WEEK
+            return history.since(today - timedelta(weeks=self.weeks)).tail(days)
+        first = self.first or history.first_day or today
+        last = min(self.last or today, today)
+        return history.between(first, last)
+
+    def describe(self, window: ContributionSeries) -> str:
+        """Return card-title wording for `window`, e.g. "in the Last 52 Weeks"."""
+        if self.weeks is not None:
+            return f"in the Last {self.weeks} Weeks"
+        if self.years is not None:
+            first_year, last_year = self.years
+            if first_year == last_year:
+                return f"in {first_year}"
+            return f"in {first_year}–{last_year}"
+        if not window:
+            return ""
+        return f"from {window.first_day} to {window.last_day}"
+
+
+DEFAULT_HEATMAP_RANGE = HeatmapRange(HEATMAP_DEFAULT_RANGE, weeks=HEATMAP_WEEKS)
+
+
+def parse_heatmap_range(spec: str) -> HeatmapRange:
+    """Parse a range spec (see the module docstring); raise `ValueError` if invalid."""
+    text = spec.strip().lower()
+    if match := _WEEKS_RE.fullmatch(text):
+        weeks = int(match[1])
+        if weeks < 1:
+            raise ValueError(f"Heatmap range '{spec}' must cover at least one week")
+        return HeatmapRange(spec, weeks=weeks)
+    if text == "all":
+        return HeatmapRange(spec)
+    if match := _YEARS_RE.fullmatch(text):
+        first_year, last_year = int(match[1]), int(match[2] or match[1])
+        if last_year < first_year:
+            raise ValueError(f"Heatmap range '{spec}' ends before it starts")
+        return HeatmapRange(
+            spec,
+            first=date(first_year, 1, 1),
+            last=date(last_year, 12, 31),
+            years=(first_year, last_year),
+        )
+    if ":" in text:
+        start, _, end = text.partition(":")
+        try:
+            first = date.fromisoformat(start) if start else None
+            last = date.fromisoformat(end) if end else None
+        except ValueError as e:
+            raise ValueError(f"Heatmap range '{spec}': {e}") from e
+        if first and last and last < first:
+            raise ValueError(f"Heatmap range '{spec}' ends before it starts")
+        return HeatmapRange(spec, first=first, last=last)
+    raise ValueError(
+        f"Invalid heatmap range '{spec}' (expected e.g. 52w, all, 2024, "
+        "2018-2025 or 2024-03-01:2024-06-30)"
+    )
+
+
+# ── Layout ─────────────────────────────────────────────────────────────────────
+
+
+def calculate_cell_dimensions(
+    grid_width: int, weeks: int = HEATMAP_WEEKS
+) -> tuple[float, float]:
+    """Return `(cell_size, cell_spacing)` fitting `weeks` columns in `grid_width`."""
+    gap_total = grid_width * GRID_SPACING_RATIO
+    cell_size = (grid_width - gap_total) / weeks
+    cell_spacing = gap_total / (weeks - 1)
+    return round(cell_size, 2), round(cell_spacing, 2)
+
+
+@dataclass(frozen=True)
+class HeatmapBand:
+    """Seven rows of cells covering day ordinals `[first, end)`.
+
+    Attributes:
+        label: Year label of a stacked band; empty for a single band.
+        first: First day ordinal drawn.
+        end: Ordinal one past the last day drawn.
+        origin: Ordinal of the day in column 0, row 0 (may precede `first`).
+        y: Vertical offset of the band's first row.
+    """
+
+    label: str
+    first: int
+    end: int
+    origin: int
+    y: float
+
+
+@dataclass(frozen=True)
+class HeatmapLayout:
+    """Cell geometry of one heatmap window.
+
+    Attributes:
+        cell_size: Cell edge length.
+        cell_spacing: Gap between neighbouring cells.
+        columns: Week columns of the widest band.
+        bands: Bands in day order; empty for an empty window.
+        xs: X offset of each column.
+        ys: Y offset of each row within a band.
+        extra_height: Height beyond one classic 52-week band; 0 unless stacked.
+    """
+
+    cell_size: float
+    cell_spacing: float
+    columns: int
+    bands: tuple[HeatmapBand, ...]
+    xs: tuple[float, ...]
+    ys: tuple[float, ...]
+    extra_height: float = 0.0
+
+    @property
+    def stacked(self) -> bool:
+        """Whether the window is drawn as stacked yearly bands."""
+        return len(self.bands) > 1
+
+    @property
+    def band_height(self) -> float:
+        """Height of one band's seven rows."""
+        return _band_height(self.cell_size, self.cell_spacing)
+
+    def position(self, band: HeatmapBand, ordinal: int) -> tuple[float, float]:
+        """Return the `(x, y)` of day `ordinal`'s cell in `band`."""
+        column, row = divmod(ordinal - band.origin, HEATMAP_DAYS_PER_WEEK)
+        return self.xs[column], band.y + self.ys[row]
+
+
+def _band_height(cell_size: float, cell_spacing: float) -> float:
+    """Height of seven rows of `cell_size` cells."""
+    rows = HEATMAP_DAYS_PER_WEEK
+    return rows * cell_size + (rows - 1) * cell_spacing
+
+
+def _columns(first: int, end: int) -> int:
+    """Week columns needed for days `[first, end)` with column 0 at `first`."""
+    return -(-(end - first) // HEATMAP_DAYS_PER_WEEK)
+
+
+def _yearly_bands(window: ContributionSeries) -> list[HeatmapBand]:
+    """Split `window` into calendar-year bands with Monday-first rows (y unset)."""
+    bands = []
+    last_year = date.fromordinal(window.end - 1).year
+    for year in range(date.fromordinal(window.start).year, last_year + 1):
+        jan_first = date(year, 1, 1)
+        start = jan_first.toordinal()
+        bands.append(
+            HeatmapBand(
+                str(year),
+                max(start, window.start),
+                min(date(year + 1, 1, 1).toordinal(), window.end),
+                start - jan_first.weekday(),
+                0.0,
+            )
+        )
+    return bands
+
+
+def heatmap_layout(window: ContributionSeries, grid_width: int = 794) -> HeatmapLayout:
+    """Lay out `window` in a `grid_width`-wide box.
+
+    Windows of at most `HEATMAP_MAX_BAND_WEEKS` weeks keep the classic cell
+    size (a 52-week column count) unless they need more columns; longer
+    windows stack yearly bands with cells fitted to the widest band, one
+    `HEATMAP_BAND_GAP_CELLS` apart, and report the added height.
+    """
+    days = len(window)
+    bands: tuple[HeatmapBand, ...]
+    if days <= HEATMAP_MAX_BAND_WEEKS * HEATMAP_DAYS_PER_WEEK:
+        columns = _columns(window.start, window.end)
+        cell_size, cell_spacing = calculate_cell_dimensions(
+            grid_width, max(columns, HEATMAP_WEEKS)
+        )
+        bands = (
+            (HeatmapBand("", window.start, window.end, window.start, 0.0),)
+            if days
+            else ()
+        )
+    else:
+        stacked = _yearly_bands(window)
+        columns = max(_columns(band.origin, band.end) for band in stacked)
+        cell_size, cell_spacing = calculate_cell_dimensions(
+            grid_width, max(columns, HEATMAP_WEEKS)
+        )
+        pitch = (
+            _band_height(cell_size, cell_spacing) + HEATMAP_BAND_GAP_CELLS * cell_size
+        )
+        bands = tuple(
+            HeatmapBand(
+                band.label, band.first, band.end, band.origin, round(i * pitch, 2)
+            )
+            for i, band in enumerate(stacked)
+        )
+    step = cell_size + cell_spacing
+    height = bands[-1].y + _band_height(cell_size, cell_spacing) if bands else 0.0
+    classic_height = _band_height(*calculate_cell_dimensions(grid_width))
+    return HeatmapLayout(
+        cell_size,
+        cell_spacing,
+        columns,
+        bands,
+        tuple(accumulate(repeat(step, max(0, columns - 1)), initial=0.0)),
+        tuple(accumulate(repeat(step, HEATMAP_DAYS_PER_WEEK - 1), initial=0.0)),
+        round(max(0.0, height - classic_height), 2),
+    )
@@ -0,0 +1,162 @@
+"""Write-if-changed build manifest.
+
+Maps each output path to a fingerprint of the inputs it was rendered from
+(template, background, resolved placeholder values, heatmap data, and the
+rendering code itself), so unchanged outputs are neither rendered nor
+rewritten. Changed outputs are written atomically (temp file + rename).
+
+Non-obvious invariants:
+    - An entry is current only if the output still exists with the recorded
+      size and, unless its mtime is unchanged, the recorded content digest —
+      a fresh checkout (new mtimes, same bytes) still counts as current.
+    - Entries are recorded only after a successful write; the manifest file
+      itself is saved atomically, so an interrupted run at worst re-renders.
+    - Outputs are streamed to disk and digested from disk in blocks, so
+      neither writing nor checking one copies the whole document in memory.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = Path(".cache/profile-card/manifest.json")
+
+_PACKAGE_DIR = Path(__file__).parent
+
+
+def fingerprint(*parts: str | bytes) -> str:
+    """Return a hex SHA-256 over `parts`, length-prefixed so splits can't collide."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def code_fingerprint() -> str:
+    """Fingerprint of the `profile_card` sources, so code changes invalidate outputs."""
+    sources = sorted(_PACKAGE_DIR.rglob("*.py"))
+    return fingerprint(
+        *(
+            part
+            for path in sources
+            for part in (path.relative_to(_PACKAGE_DIR).as_posix(), path.read_bytes())
+        )
+    )
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Write `text` to `path` atomically (see `write_chunks_atomic`)."""
+    write_chunks_atomic(path, (text,))
+
+
+def write_chunks_atomic(path: Path, chunks: Iterable[str]) -> None:
+    """Stream `chunks` to `path` via a sibling temp file and `os.replace`.
+
+    Chunks are encoded through the file's write buffer as they come, so the
+    document is never held as one string or one bytes object. Keeps the
+    existing file's permission bits (0o644 for new files).
+    """
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(chunks)
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _file_digest(path: Path) -> str:
+    """Return the hex SHA-256 of `path`, read in fixed-size blocks."""
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class BuildManifest:
+    """`output path → input fingerprint` map persisted as JSON. Thread-safe."""
+
+    def __init__(self, path: Path = MANIFEST_PATH, load: bool = True) -> None:
+        """Load the manifest at `path`; a missing or corrupt file starts empty.
+
+        With `load=False` every output is treated as stale (a forced rebuild),
+        but `save` still writes the entries recorded during this run.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, str | int]] = {}
+        self._dirty = False
+        if not load:
+            return
+        try:
+            self._entries = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable manifest %s: %s", path, e)
+
+    def is_current(self, out_path: Path, fp: str) -> bool:
+        """Return True if `out_path` exists and was last written from `fp`."""
+        with self._lock:
+            entry = self._entries.get(str(out_path))
+        if entry is None or entry["fingerprint"] != fp:
+            return False
+        try:
+            stat = out_path.stat()
+        except FileNotFoundError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if _file_digest(out_path) != entry["digest"]:
+            return False
+        self._record(out_path, fp, str(entry["digest"]))  # refresh mtime fast path
+        return True
+
+    def write(self, out_path: Path, text: str, fp: str) -> None:
+        """Atomically write `text` to `out_path` and record it under `fp`."""
+        self.write_chunks(out_path, (text,), fp)
+
+    def write_chunks(self, out_path: Path, chunks: Iterable[str], fp: str) -> None:
+        """Stream `chunks` to `out_path` atomically and record it under `fp`."""
+        write_chunks_atomic(out_path, chunks)
+        self.record(out_path, fp)
+
+    def record(self, out_path: Path, fp: str) -> None:
+        """Record the existing `out_path` as produced from `fp`."""
+        self._record(out_path, fp, _file_digest(out_path))
+
+    def _record(self, out_path: Path, fp: str, digest: str) -> None:
+        """Store the entry for `out_path` with its current size and mtime."""
+        stat = out_path.stat()
+        with self._lock:
+            self._entries[str(out_path)] = {
+                "fingerprint": fp,
+                "digest": digest,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        """Persist the manifest atomically if any entry changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            text = json.dumps(self._entries, indent=2, sort_keys=True) + "\n"
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self.path, text)
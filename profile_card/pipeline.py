@@ -0,0 +1,662 @@
+"""Card generation pipeline: fetch → `CardContext` → render → write.
+
+Shared by the single-user CLI run and batch (roster) mode so both go through
+the same session, template cache and rendering code.
+
+Non-obvious invariants:
+    - Template reads, template compilation and background reads are cached
+      for the process lifetime (until `invalidate_assets`); batch runs
+      compile each asset once regardless of roster size.
+    - Outputs are written atomically; with a `BuildManifest`, outputs whose
+      input fingerprint is unchanged are neither rendered nor rewritten.
+    - Outputs render on a thread pool, but results are logged and errors
+      raised on the calling thread in style/output order, so logs match a
+      sequential run apart from timings.
+    - Each style's card is rendered once per context with the background
+      left open; its outputs (with and without background) splice the
+      fragment in, so render cost doesn't grow with the number of variants.
+    - Memory grows with document size, not constant: marker chunks and each
+      style's slotted render are held (unjoined) until its variants are
+      written, about 2.4× the largest card (166 KiB peak for a 76 KiB
+      52-week card, 612 KiB for a 259 KiB whole-history one). Streaming
+      generators per output would flatten that at +13–25% render time.
+    - Backgrounds are always read from `DOCS_DIR / style.subdir`; only the
+      output directory moves in batch mode (`DOCS_DIR / <user> / <subdir>`).
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import cast
+
+from profile_card.cards import (
+    STEAM_GAME_PLACEHOLDER,
+    CardContext,
+    CardStyle,
+    MarkerGenerator,
+    create_svg_legend,
+    iter_svg_grid_with_heatmap,
+    read_background_fragment,
+    resolve_placeholders,
+)
+from profile_card.config import Config
+from profile_card.fetchers import (
+    FETCH_MAX_WORKERS,
+    GITHUB_RATE_LIMITER,
+    STEAM_CACHE_TTL_SECONDS,
+    ContributionData,
+    fetch_contributions_from_github,
+    fetch_currently_playing_from_steam,
+    map_contributions_to_levels,
+    summarize_contributions,
+)
+from profile_card.heatmap import DEFAULT_HEATMAP_RANGE, parse_heatmap_range
+from profile_card.manifest import (
+    BuildManifest,
+    code_fingerprint,
+    fingerprint,
+    write_chunks_atomic,
+)
+from profile_card.series import ContributionSeries
+from profile_card.sources import DataSource, fetch_sources
+from profile_card.store import HistoryStore
+from profile_card.template import (
+    CompiledTemplate,
+    HoleValue,
+    SlottedRender,
+    compile_template,
+)
+from profile_card.tracing import span, worker_pool
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = Path("assets")
+DOCS_DIR = Path("docs")
+
+# Users fetched concurrently in batch mode; each may itself run
+# `FETCH_MAX_WORKERS` GraphQL batches.
+BATCH_MAX_WORKERS = 4
+
+# Output files rendered and written concurrently per context. Hashing and
+# file I/O release the GIL; template joins are short.
+RENDER_MAX_WORKERS = 4
+
+# Default freshness of `--serve` cards (see `profile_card.server`); defined
+# here so the CLI can show it without importing `http.server`.
+SERVER_CACHE_TTL_SECONDS = 300.0
+
+# Budget for the optional Steam source (incl. retries) before the card falls
+# back to "nothing"; GitHub is required and bounded by its request timeouts.
+STEAM_SOURCE_TIMEOUT_SECONDS = 5.0
+
+BACKGROUND_MARKER = "<!-- Background -->"
+LEGEND_MARKER = "<!-- Contribution Grid Legend -->"
+GRID_MARKER = "<!-- Contribution Grid -->"
+
+# Marker generators available to every style; each runs at most once per
+# context, and only if an active template contains its marker.
+SHARED_MARKERS: dict[str, MarkerGenerator] = {
+    LEGEND_MARKER: lambda ctx: create_svg_legend(ctx.levels),
+    GRID_MARKER: lambda ctx: iter_svg_grid_with_heatmap(
+        ctx.levels, ctx.raw_counts, compact=ctx.compact_heatmap
+    ),
+}
+
+_TRAILING_WS_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+
+
+# ── Assets ─────────────────────────────────────────────────────────────────────
+
+
+@lru_cache(maxsize=None)
+def read_asset(path: Path) -> str:
+    """Return the UTF-8 text of `path`, cached for the process lifetime."""
+    return path.read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=None)
+def _background_fragment(style_dir: Path, bg_file: str) -> str:
+    """Cached `read_background_fragment`, trailing blanks pre-stripped per line."""
+    return _TRAILING_WS_RE.sub("", read_background_fragment(style_dir, bg_file))
+
+
+@lru_cache(maxsize=None)
+def load_template(
+    path: Path, markers: frozenset[str] = frozenset(), strip_trailing_ws: bool = False
+) -> CompiledTemplate:
+    """Read and compile the template at `path`, cached per `(path, markers)`."""
+    return compile_template(read_asset(path), markers, strip_trailing_ws)
+
+
+def invalidate_assets() -> None:
+    """Forget cached asset reads, compiled templates and backgrounds.
+
+    The next render re-reads whatever it uses from disk (see `--watch`).
+    """
+    read_asset.cache_clear()
+    _background_fragment.cache_clear()
+    load_template.cache_clear()
+
+
+def style_inputs(style: CardStyle) -> list[Path]:
+    """Return the files `style` renders from: template, index template, background."""
+    paths = [ASSETS_DIR / style.template]
+    if style.index_template:
+        paths.append(ASSETS_DIR / style.index_template)
+    if style.background:
+        paths.append(DOCS_DIR / style.subdir / style.background)
+    return paths
+
+
+def style_templates(
+    style: CardStyle,
+) -> tuple[CompiledTemplate, CompiledTemplate | None]:
+    """Return `style`'s compiled card template and index template (if any)."""
+    card = load_template(
+        ASSETS_DIR / style.template,
+        frozenset([BACKGROUND_MARKER, *SHARED_MARKERS, *style.extra_markers]),
+        strip_trailing_ws=True,
+    )
+    index = (
+        load_template(ASSETS_DIR / style.index_template)
+        if style.index_template
+        else None
+    )
+    return card, index
+
+
+def referenced_placeholders(active_styles: dict[str, CardStyle]) -> frozenset[str]:
+    """Return every placeholder referenced by the active styles' templates."""
+    names: set[str] = set()
+    for style in active_styles.values():
+        card, index = style_templates(style)
+        names |= card.placeholders
+        if index is not None:
+            names |= index.placeholders
+    return frozenset(names)
+
+
+def validate_template_files(active_styles: dict[str, CardStyle]) -> None:
+    """Raise on first missing template/background — run before any network call."""
+    for style_name, style in active_styles.items():
+        template_path = ASSETS_DIR / style.template
+        if not template_path.is_file():
+            raise FileNotFoundError(
+                f"Style '{style_name}' template missing: {template_path}"
+            )
+        if style.background:
+            bg_path = DOCS_DIR / style.subdir / style.background
+            if not bg_path.is_file():
+                raise FileNotFoundError(
+                    f"Style '{style_name}' background missing: {bg_path}"
+                )
+        if style.index_template:
+            index_path = ASSETS_DIR / style.index_template
+            if not index_path.is_file():
+                raise FileNotFoundError(
+                    f"Style '{style_name}' index template missing: {index_path}"
+                )
+
+
+# ── Fetch ──────────────────────────────────────────────────────────────────────
+
+
+def resolve_steam_game(
+    active_styles: dict[str, CardStyle],
+    steam_id: str,
+    store: HistoryStore | None = None,
+    ttl: float = STEAM_CACHE_TTL_SECONDS,
+    background: bool = False,
+) -> str:
+    """Fetch the Steam game name (cached in `store` for `ttl`), or `"nothing"`.
+
+    `background` serves an expired answer while it revalidates (see
+    `fetch_currently_playing_from_steam`).
+
+    `"nothing"` is also returned when no active template references
+    `{{st.game}}`, when `steam_id` is empty, or when `STEAM_API_KEY` env var is
+    unset (with a warning).
+    """
+    if not steam_id or STEAM_GAME_PLACEHOLDER not in referenced_placeholders(
+        active_styles
+    ):
+        return "nothing"
+    api_key = os.getenv("STEAM_API_KEY")
+    if not api_key:
+        logger.warning(
+            "Steam-requiring style active but STEAM_API_KEY not set — "
+            "recently-playing placeholder will fall back to 'nothing'."
+        )
+        return "nothing"
+    return (
+        fetch_currently_playing_from_steam(api_key, steam_id, store, ttl, background)
+        or "nothing"
+    )
+
+
+def _cached_steam_game(store: HistoryStore | None, steam_id: str) -> str:
+    """Return the last stored Steam answer for `steam_id` (any age), or `"nothing"`."""
+    cached = store.load_steam_game(steam_id) if store and steam_id else None
+    return (cached[0] if cached else None) or "nothing"
+
+
+def fetch_card_context(
+    config: Config,
+    active_styles: dict[str, CardStyle],
+    token: str,
+    store: HistoryStore | None = None,
+    fetch_workers: int = FETCH_MAX_WORKERS,
+    compact_heatmap: bool = False,
+    steam_ttl: float = STEAM_CACHE_TTL_SECONDS,
+    steam_background: bool = False,
+) -> CardContext:
+    """Fetch GitHub (+ Steam, if needed) data for `config` into a `CardContext`.
+
+    Sources run concurrently (see `profile_card.sources`); Steam is optional
+    and, after `STEAM_SOURCE_TIMEOUT_SECONDS`, falls back to its last stored
+    answer (or `"nothing"`). Long-lived callers pass `steam_background` so an
+    expired Steam answer is served at once and refreshed for the next fetch.
+    """
+    results = fetch_sources(
+        [
+            DataSource(
+                "github",
+                lambda _: fetch_contributions_from_github(
+                    config["user"]["name"], token, store, fetch_workers
+                ),
+            ),
+            DataSource(
+                "steam",
+                lambda _: resolve_steam_game(
+                    active_styles,
+                    config["steam_id"],
+                    store,
+                    steam_ttl,
+                    steam_background,
+                ),
+                timeout=STEAM_SOURCE_TIMEOUT_SECONDS,
+                fallback=_cached_steam_game(store, config["steam_id"]),
+            ),
+        ]
+    )
+    return build_card_context(
+        cast(ContributionData, results["github"]),
+        config,
+        cast(str, results["steam"]),
+        compact_heatmap,
+    )
+
+
+def load_card_context(
+    config: Config, store: HistoryStore, compact_heatmap: bool = False
+) -> CardContext:
+    """Build a `CardContext` for `config` from `store` alone — no network.
+
+    Stats are recomputed over the stored history up to its last synced day;
+    the Steam game is the last stored answer. Raises `LookupError` when the
+    user has never been synced into `store`.
+    """
+    name = config["user"]["name"]
+    history = ContributionSeries.from_mapping(store.load(name))
+    public_repos = store.load_public_repos(name)
+    if not history or public_repos is None:
+        raise LookupError(
+            f"No cached history for '{name}' in {store.path}; "
+            "run once without --from-cache."
+        )
+    logger.info(
+        "Rendering '%s' from cache (history through %s)", name, history.last_day
+    )
+    data = summarize_contributions(
+        history, public_repos, datetime.now(timezone.utc).date()
+    )
+    return build_card_context(
+        data, config, _cached_steam_game(store, config["steam_id"]), compact_heatmap
+    )
+
+
+def build_card_context(
+    data: ContributionData,
+    config: Config,
+    steam_game: str = "nothing",
+    compact_heatmap: bool = False,
+) -> CardContext:
+    """Wrap already-fetched `data` in a `CardContext`, mapping heatmap levels.
+
+    The heatmap window is cut from `data["history"]` by `config`'s
+    `heatmap_range` (default: the last 52 weeks); raises `ValueError` on an
+    invalid range.
+    """
+    heatmap_range = (
+        parse_heatmap_range(config["heatmap_range"])
+        if "heatmap_range" in config
+        else DEFAULT_HEATMAP_RANGE
+    )
+    raw_counts = heatmap_range.window(
+        data["history"], date.fromisoformat(data["as_of"])
+    )
+    return CardContext(
+        data=data,
+        levels=map_contributions_to_levels(raw_counts),
+        raw_counts=raw_counts,
+        config=config,
+        steam_game=steam_game,
+        compact_heatmap=compact_heatmap,
+        heatmap_range=heatmap_range,
+    )
+
+
+# ── Render ─────────────────────────────────────────────────────────────────────
+
+
+def _warn_unreplaced(missing: set[str], out_path: Path) -> None:
+    """Log template placeholders that no resolver provided for `out_path`."""
+    if missing:
+        logger.warning(
+            "Unreplaced placeholders in %s: %s", out_path, ", ".join(sorted(missing))
+        )
+
+
+def _context_fingerprint(ctx: CardContext) -> str:
+    """Fingerprint the marker inputs of `ctx` — heatmap data, encoding, code."""
+    return fingerprint(
+        code_fingerprint(),
+        str(ctx.raw_counts.start),
+        ctx.raw_counts.values.tobytes(),
+        ctx.levels.values.tobytes(),
+        str(ctx.compact_heatmap),
+    )
+
+
+class _MarkerCache:
+    """Thread-safe memo of marker values for one context; each generator runs once.
+
+    Chunked values are kept as a tuple of chunks, never joined: one value feeds
+    every style and variant using the marker, and streaming the generator to
+    disk instead would rerun it per output. Peak memory thus grows with card
+    size (see the module invariants and `render_styles/whole_history`).
+    """
+
+    def __init__(self, ctx: CardContext) -> None:
+        """Start empty for `ctx`."""
+        self._ctx = ctx
+        self._values: dict[MarkerGenerator, HoleValue] = {}
+        self._lock = threading.Lock()
+
+    def resolve(
+        self, template: CompiledTemplate, style: CardStyle
+    ) -> dict[str, HoleValue]:
+        """Return `template`'s style-specific and shared marker values.
+
+        Chunked marker content is kept as a tuple of chunks, never joined,
+        and shared by every caller.
+        """
+        values: dict[str, HoleValue] = {}
+        with self._lock:
+            for marker in template.markers:
+                generate = style.extra_markers.get(marker) or SHARED_MARKERS.get(marker)
+                if generate is None:
+                    continue
+                if generate not in self._values:
+                    with span("marker", marker=marker):
+                        value = generate(self._ctx)
+                        self._values[generate] = (
+                            value if isinstance(value, str) else tuple(value)
+                        )
+                values[marker] = self._values[generate]
+        return values
+
+
+@dataclass(frozen=True)
+class _RenderTask:
+    """One output file: where it goes, its input fingerprint and how to render it.
+
+    `render` returns the document as unjoined parts, streamed to the file.
+    """
+
+    style_name: str
+    out_path: Path
+    fingerprint: str
+    render: Callable[[], list[str]]
+
+
+class _SlottedCard:
+    """One style's card, rendered once with the background slot left open.
+
+    Thread-safe. The document is resolved (and its markers generated) on the
+    first `chunks` call, so styles whose outputs are all current never pay for it;
+    every output variant is then a splice of the shared head and tail.
+    """
+
+    def __init__(
+        self,
+        template: CompiledTemplate,
+        style: CardStyle,
+        placeholders: dict[str, str],
+        markers: _MarkerCache,
+    ) -> None:
+        """Prepare to render `template` with `placeholders` and `markers`."""
+        self._template = template
+        self._style = style
+        self._placeholders = placeholders
+        self._markers = markers
+        self._slotted: SlottedRender | None = None
+        self._lock = threading.Lock()
+
+    def chunks(self, background: str) -> list[str]:
+        """Return the card's parts with `background` in the background slot."""
+        with self._lock:
+            if self._slotted is None:
+                values = {
+                    **self._placeholders,
+                    **self._markers.resolve(self._template, self._style),
+                }
+                self._slotted = self._template.render_slotted(values, BACKGROUND_MARKER)
+            slotted = self._slotted
+        return slotted.chunks(background)
+
+
+def _plan_style(
+    style_name: str,
+    style: CardStyle,
+    ctx_fp: str,
+    ctx: CardContext,
+    style_dir: Path,
+    markers: _MarkerCache,
+) -> list[_RenderTask]:
+    """Return render tasks for one style's outputs (and index), in output order."""
+    template, index = style_templates(style)
+    bg_fragment = (
+        _background_fragment(DOCS_DIR / style.subdir, style.background)
+        if style.background
+        else ""
+    )
+    names = template.placeholders | (index.placeholders if index else set())
+    placeholders = resolve_placeholders(names, style.resolvers, ctx)
+    placeholders_fp = fingerprint(
+        *(part for item in sorted(placeholders.items()) for part in item)
+    )
+    missing = template.missing({**placeholders, **dict.fromkeys(template.markers, "")})
+    card_fp = fingerprint(
+        ctx_fp, read_asset(ASSETS_DIR / style.template), placeholders_fp
+    )
+
+    card = _SlottedCard(template, style, placeholders, markers)
+    tasks = []
+    for output_file, inject_bg in style.outputs:
+        out_path = style_dir / output_file
+        background = bg_fragment if inject_bg else ""
+        _warn_unreplaced(missing, out_path)
+        tasks.append(
+            _RenderTask(
+                style_name,
+                out_path,
+                fingerprint(card_fp, background),
+                partial(card.chunks, background),
+            )
+        )
+
+    if index is not None:
+        index_path = style_dir / "index.html"
+        _warn_unreplaced(index.missing(placeholders), index_path)
+        index_fp = fingerprint(
+            code_fingerprint(),
+            read_asset(ASSETS_DIR / style.index_template),
+            placeholders_fp,
+        )
+        tasks.append(
+            _RenderTask(
+                style_name,
+                index_path,
+                index_fp,
+                partial(index.render_chunks, placeholders),
+            )
+        )
+    return tasks
+
+
+def _run_task(task: _RenderTask, manifest: BuildManifest | None) -> tuple[bool, float]:
+    """Render and atomically write `task` unless `manifest` has it current.
+
+    Returns whether the file was written and the elapsed seconds. Does not
+    log, so callers can report results in a deterministic order.
+    """
+    start = time.perf_counter()
+    with span("output", path=str(task.out_path)) as current:
+        if manifest is not None and manifest.is_current(
+            task.out_path, task.fingerprint
+        ):
+            if current:
+                current.set(written=False)
+            return False, time.perf_counter() - start
+        with span("render", path=str(task.out_path)):
+            chunks = task.render()
+        with span("write", path=str(task.out_path), chunks=len(chunks)):
+            if manifest is not None:
+                manifest.write_chunks(task.out_path, chunks, task.fingerprint)
+            else:
+                write_chunks_atomic(task.out_path, chunks)
+        if current:
+            current.set(written=True)
+    return True, time.perf_counter() - start
+
+
+def render_styles(
+    active_styles: dict[str, CardStyle],
+    ctx: CardContext,
+    out_root: Path = DOCS_DIR,
+    manifest: BuildManifest | None = None,
+    jobs: int = RENDER_MAX_WORKERS,
+) -> int:
+    """Render every active style for `ctx` under `out_root / <subdir>`.
+
+    Only placeholders and markers a style's templates reference are resolved,
+    markers only once an output actually needs rendering. With `manifest`,
+    outputs whose input fingerprint is unchanged are skipped. Outputs render
+    on up to `jobs` threads but are logged (with per-file timing) in style and
+    output order; the first failing output in that order is logged with its
+    style and re-raised. Returns the number of files written.
+    """
+    ctx_fp = _context_fingerprint(ctx)
+    markers = _MarkerCache(ctx)
+    tasks: list[_RenderTask] = []
+    for style_name, style in active_styles.items():
+        style_dir = out_root / style.subdir
+        style_dir.mkdir(parents=True, exist_ok=True)
+        tasks += _plan_style(style_name, style, ctx_fp, ctx, style_dir, markers)
+
+    files_written = 0
+    with worker_pool(max(1, min(jobs, len(tasks) or 1))) as pool:
+        results = pool.map(partial(_run_task, manifest=manifest), tasks)
+        for task in tasks:
+            try:
+                written, elapsed = next(results)
+            except Exception as e:
+                logger.error(
+                    "Failed to process %s → %s: %s",
+                    task.style_name,
+                    task.out_path.name,
+                    e,
+                )
+                raise
+            if written:
+                files_written += 1
+                logger.info("Written: %s (%.1f ms)", task.out_path, elapsed * 1000)
+            else:
+                logger.info("Unchanged: %s", task.out_path)
+    return files_written
+
+
+def render_card(style: CardStyle, ctx: CardContext, background: bool = True) -> str:
+    """Render one card for `ctx` in memory, with or without `style`'s background."""
+    return "".join(render_card_chunks(style, ctx, background))
+
+
+def render_card_chunks(
+    style: CardStyle, ctx: CardContext, background: bool = True
+) -> list[str]:
+    """Like `render_card`, but return the card's parts unjoined, for streaming."""
+    template, _ = style_templates(style)
+    placeholders = resolve_placeholders(template.placeholders, style.resolvers, ctx)
+    bg_fragment = (
+        _background_fragment(DOCS_DIR / style.subdir, style.background)
+        if background and style.background
+        else ""
+    )
+    return _SlottedCard(template, style, placeholders, _MarkerCache(ctx)).chunks(
+        bg_fragment
+    )
+
+
+# ── Batch ──────────────────────────────────────────────────────────────────────
+
+
+def render_batch(
+    roster: list[Config],
+    active_styles: dict[str, CardStyle],
+    token: str,
+    store: HistoryStore | None = None,
+    workers: int = BATCH_MAX_WORKERS,
+    fetch_workers: int = FETCH_MAX_WORKERS,
+    compact_heatmap: bool = False,
+    manifest: BuildManifest | None = None,
+    jobs: int = RENDER_MAX_WORKERS,
+    steam_ttl: float = STEAM_CACHE_TTL_SECONDS,
+) -> int:
+    """Fetch up to `workers` users at once and render each into `DOCS_DIR/<user>/`.
+
+    Users render in roster order as their fetches complete, so logs and output
+    are deterministic. `workers` is capped by the spare GitHub rate-limit
+    budget, once known. The first failing user's error propagates. Returns the
+    total number of files written.
+    """
+
+    def fetch(config: Config) -> CardContext:
+        return fetch_card_context(
+            config,
+            active_styles,
+            token,
+            store,
+            fetch_workers,
+            compact_heatmap,
+            steam_ttl,
+        )
+
+    workers = GITHUB_RATE_LIMITER.suggest_workers(workers)
+    logger.info("Batch: %d user(s), %d fetch worker(s)", len(roster), workers)
+    files_written = 0
+    with worker_pool(workers) as pool:
+        contexts: Iterator[CardContext] = pool.map(fetch, roster)
+        for config, ctx in zip(roster, contexts, strict=True):
+            user_root = DOCS_DIR / config["user"]["name"]
+            files_written += render_styles(
+                active_styles, ctx, user_root, manifest, jobs
+            )
+    return files_written
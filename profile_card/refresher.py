@@ -0,0 +1,183 @@
+"""Long-running card refresher.
+
+Keeps one process alive so the HTTP session (and its TLS connections), the
+compiled templates, the history store and the build manifest stay warm; each
+refresh is then an incremental fetch plus write-if-changed render instead of
+a cold pipeline.
+
+Non-obvious invariants:
+    - Waiting targets sit in a heap keyed by `due_at`; once due they move to
+      a second heap keyed by `(-recent_activity, last_refreshed)`, so among
+      due targets the ones with contributions in the last
+      `REFRESH_ACTIVITY_DAYS` go first, then the stalest — regardless of
+      which became due earlier.
+    - Active targets are rescheduled after `interval * REFRESH_ACTIVE_FACTOR`;
+      every delay gets ±`jitter` so users don't hit the API in lockstep.
+    - A failed refresh is logged and rescheduled; it never stops the loop.
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from profile_card.cards import CardStyle
+from profile_card.config import Config
+from profile_card.fetchers import FETCH_MAX_WORKERS, STEAM_CACHE_TTL_SECONDS
+from profile_card.manifest import BuildManifest
+from profile_card.pipeline import RENDER_MAX_WORKERS, fetch_card_context, render_styles
+from profile_card.store import HistoryStore
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL_SECONDS = 900.0
+REFRESH_JITTER_RATIO = 0.1
+# Users with contributions in the trailing window refresh this much sooner.
+REFRESH_ACTIVITY_DAYS = 3
+REFRESH_ACTIVE_FACTOR = 0.5
+
+
+@dataclass
+class _Entry:
+    """A scheduled target; ordered by `due_at`, then by `priority` once due."""
+
+    due_at: float
+    activity: int
+    last_refreshed: float
+    config: Config
+    out_root: Path
+
+    @property
+    def priority(self) -> tuple[int, float]:
+        """Sort key among due targets: most active, then least recently run."""
+        return -self.activity, self.last_refreshed
+
+
+class Refresher:
+    """Re-renders each `(config, out_root)` target on a jittered schedule."""
+
+    def __init__(
+        self,
+        targets: list[tuple[Config, Path]],
+        active_styles: dict[str, CardStyle],
+        token: str,
+        store: HistoryStore | None = None,
+        manifest: BuildManifest | None = None,
+        interval: float = REFRESH_INTERVAL_SECONDS,
+        jitter: float = REFRESH_JITTER_RATIO,
+        fetch_workers: int = FETCH_MAX_WORKERS,
+        jobs: int = RENDER_MAX_WORKERS,
+        compact_heatmap: bool = False,
+        steam_ttl: float = STEAM_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Schedule every target for an immediate first refresh, in order."""
+        self._active_styles = active_styles
+        self._token = token
+        self._store = store
+        self._manifest = manifest
+        self.interval = interval
+        self.jitter = jitter
+        self._fetch_workers = fetch_workers
+        self._jobs = jobs
+        self._compact_heatmap = compact_heatmap
+        self._steam_ttl = steam_ttl
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._seq = itertools.count()
+        now = clock()
+        self._waiting: list[tuple[float, int, _Entry]] = []
+        self._due: list[tuple[tuple[int, float], int, _Entry]] = []
+        for config, out_root in targets:
+            self._push(_Entry(now, 0, float("-inf"), config, out_root))
+
+    def __len__(self) -> int:
+        """Number of scheduled targets."""
+        return len(self._waiting) + len(self._due)
+
+    def _push(self, entry: _Entry) -> None:
+        """Schedule `entry`; the sequence number keeps ties in insertion order."""
+        heapq.heappush(self._waiting, (entry.due_at, next(self._seq), entry))
+
+    def _promote(self, now: float) -> None:
+        """Move every target due by `now` into the priority-ordered due heap."""
+        while self._waiting and self._waiting[0][0] <= now:
+            _, seq, entry = heapq.heappop(self._waiting)
+            heapq.heappush(self._due, (entry.priority, seq, entry))
+
+    def _delay(self, active: bool) -> float:
+        """Return the jittered delay before the next refresh of a target."""
+        base = self.interval * (REFRESH_ACTIVE_FACTOR if active else 1.0)
+        return base * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+    def next_due(self) -> float:
+        """Return the clock time at which the next target is due."""
+        if self._due:
+            return min(entry.due_at for _, _, entry in self._due)
+        return self._waiting[0][0]
+
+    def refresh_next(self) -> int:
+        """Refresh the highest-priority due target now and reschedule it.
+
+        With nothing due yet, the earliest-due target is refreshed early.
+        Returns the number of files written (0 on failure).
+        """
+        start = self._clock()
+        self._promote(start)
+        if not self._due:
+            self._promote(self._waiting[0][0])
+        entry = heapq.heappop(self._due)[-1]
+        name = entry.config["user"]["name"]
+        files_written = 0
+        activity = entry.activity
+        try:
+            ctx = fetch_card_context(
+                entry.config,
+                self._active_styles,
+                self._token,
+                self._store,
+                self._fetch_workers,
+                self._compact_heatmap,
+                self._steam_ttl,
+                steam_background=True,
+            )
+            files_written = render_styles(
+                self._active_styles, ctx, entry.out_root, self._manifest, self._jobs
+            )
+            if self._manifest is not None:
+                self._manifest.save()
+            activity = ctx.data["history"].tail(REFRESH_ACTIVITY_DAYS).total()
+        except Exception:
+            logger.exception("Refresh failed for %s", name)
+        now = self._clock()
+        delay = self._delay(activity > 0)
+        logger.info(
+            "Refreshed %s: %d file(s) in %.2fs; next in %.0fs",
+            name,
+            files_written,
+            now - start,
+            delay,
+        )
+        self._push(_Entry(now + delay, activity, now, entry.config, entry.out_root))
+        return files_written
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Refresh targets as they come due until `stop` is set."""
+        stop = stop or threading.Event()
+        logger.info(
+            "Refresher: %d target(s), interval %.0fs ±%.0f%%",
+            len(self),
+            self.interval,
+            self.jitter * 100,
+        )
+        while self and not stop.is_set():
+            wait = self.next_due() - self._clock()
+            if wait > 0 and stop.wait(wait):
+                break
+            self.refresh_next()
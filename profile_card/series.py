@@ -0,0 +1,149 @@
+"""Compact day-indexed contribution series.
+
+`ContributionSeries` replaces `dict[str, int]` keyed by ISO date strings: a
+start day ordinal plus a contiguous `array` of per-day values, so date lookup
+is O(1) index arithmetic and no ISO string is parsed after construction.
+
+Non-obvious invariants:
+    - Series are gap-free: days missing from the source mapping are zero.
+    - Slices copy the underlying array segment; series are not mutated after
+      construction.
+"""
+
+from array import array
+from collections.abc import Callable, Iterator, Mapping
+from datetime import date
+
+# `I` is ≥ 4 bytes on every supported platform; levels (0–5) fit in `B`.
+COUNT_TYPECODE = "I"
+LEVEL_TYPECODE = "B"
+
+
+class ContributionSeries:
+    """Per-day values for the contiguous range `[first, first + len)`.
+
+    Attributes:
+        start: Proleptic Gregorian ordinal of the first day (`date.toordinal`).
+        values: One value per day from `start` onward.
+    """
+
+    __slots__ = ("start", "values")
+
+    def __init__(self, start: int, values: "array[int] | None" = None) -> None:
+        """Wrap `values` (default: empty `COUNT_TYPECODE` array) starting at `start`."""
+        self.start = start
+        self.values = values if values is not None else array(COUNT_TYPECODE)
+
+    @classmethod
+    def from_mapping(
+        cls, mapping: Mapping[str, int], typecode: str = COUNT_TYPECODE
+    ) -> "ContributionSeries":
+        """Build a gap-filled series from an `ISO date → value` mapping."""
+        if not mapping:
+            return cls(date.min.toordinal(), array(typecode))
+        ordinals = {date.fromisoformat(d).toordinal(): v for d, v in mapping.items()}
+        start = min(ordinals)
+        values = array(typecode, [0]) * (max(ordinals) - start + 1)
+        for ordinal, value in ordinals.items():
+            values[ordinal - start] = value
+        return cls(start, values)
+
+    # ── Range ──────────────────────────────────────────────────────────────────
+
+    @property
+    def end(self) -> int:
+        """Ordinal one past the last day."""
+        return self.start + len(self.values)
+
+    @property
+    def first_day(self) -> date | None:
+        """First day covered, or None when empty."""
+        return date.fromordinal(self.start) if self.values else None
+
+    @property
+    def last_day(self) -> date | None:
+        """Last day covered, or None when empty."""
+        return date.fromordinal(self.end - 1) if self.values else None
+
+    def __len__(self) -> int:
+        """Number of days covered."""
+        return len(self.values)
+
+    def __eq__(self, other: object) -> bool:
+        """Equal when both cover the same days with the same values."""
+        if not isinstance(other, ContributionSeries):
+            return NotImplemented
+        return self.start == other.start and self.values == other.values
+
+    def __repr__(self) -> str:
+        """Show the covered range and length."""
+        return (
+            f"ContributionSeries({self.first_day} → {self.last_day}, "
+            f"{len(self)} day(s))"
+        )
+
+    # ── Access ─────────────────────────────────────────────────────────────────
+
+    def get(self, day: date | str, default: int = 0) -> int:
+        """Return the value for `day` (a `date` or ISO string), or `default`."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        index = day.toordinal() - self.start
+        if 0 <= index < len(self.values):
+            return self.values[index]
+        return default
+
+    def __getitem__(self, day: date | str) -> int:
+        """Return the value for `day`; raise `KeyError` outside the range."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        index = day.toordinal() - self.start
+        if not 0 <= index < len(self.values):
+            raise KeyError(day)
+        return self.values[index]
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        """Yield `(ordinal, value)` pairs in day order."""
+        return enumerate(self.values, self.start)
+
+    def iso_items(self) -> Iterator[tuple[str, int]]:
+        """Yield `(ISO date, value)` pairs in day order."""
+        for ordinal, value in enumerate(self.values, self.start):
+            yield date.fromordinal(ordinal).isoformat(), value
+
+    def to_dict(self) -> dict[str, int]:
+        """Return an `ISO date → value` dict (the pre-series representation)."""
+        return dict(self.iso_items())
+
+    # ── Derivation ─────────────────────────────────────────────────────────────
+
+    def since(self, first: date) -> "ContributionSeries":
+        """Return the days from `first` (inclusive) to the end."""
+        offset = max(0, first.toordinal() - self.start)
+        return ContributionSeries(self.start + offset, self.values[offset:])
+
+    def between(self, first: date, last: date) -> "ContributionSeries":
+        """Return the days `first`–`last` (inclusive), zero outside the series."""
+        start, end = first.toordinal(), max(first.toordinal(), last.toordinal() + 1)
+        values = array(self.values.typecode, [0]) * (end - start)
+        lo, hi = max(start, self.start), min(end, self.end)
+        if lo < hi:
+            values[lo - start : hi - start] = self.values[
+                lo - self.start : hi - self.start
+            ]
+        return ContributionSeries(start, values)
+
+    def tail(self, days: int) -> "ContributionSeries":
+        """Return the last `days` days (fewer if the series is shorter)."""
+        offset = max(0, len(self.values) - days)
+        return ContributionSeries(self.start + offset, self.values[offset:])
+
+    def map(
+        self, fn: Callable[[int], int], typecode: str = COUNT_TYPECODE
+    ) -> "ContributionSeries":
+        """Return a same-range series of `fn(value)` stored as `typecode`."""
+        return ContributionSeries(self.start, array(typecode, map(fn, self.values)))
+
+    def total(self) -> int:
+        """Sum of all values."""
+        return sum(self.values)
@@ -0,0 +1,284 @@
+"""On-demand HTTP card server.
+
+Serves `GET /<user>/<style>.svg` (`?background=0` for the transparent
+variant) by running the fetch → `CardContext` → render pipeline on request,
+so cards are at most `SERVER_CACHE_TTL_SECONDS` stale instead of a day.
+
+Non-obvious invariants:
+    - Only configured users (config.json + optional roster) are served; any
+      other path is a 404, so the server can't be used to fetch arbitrary
+      GitHub accounts with the configured token.
+    - Fetched contexts live in an LRU/TTL cache; concurrent misses for one
+      user share a single in-flight fetch. Failed fetches are not cached.
+    - Rendered SVGs hang off the cached context as encoded bytes (encoded
+      chunk by chunk, never as one `str`), so they expire with it and
+      `Cache-Control: max-age` is the context's remaining lifetime.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Generic, TypeVar
+from urllib.parse import parse_qs, urlsplit
+
+from profile_card.cards import CARD_STYLES, CardContext, CardStyle
+from profile_card.config import Config
+from profile_card.fetchers import FETCH_MAX_WORKERS, STEAM_CACHE_TTL_SECONDS
+from profile_card.pipeline import (
+    SERVER_CACHE_TTL_SECONDS,
+    fetch_card_context,
+    render_card_chunks,
+)
+from profile_card.store import HistoryStore
+
+logger = logging.getLogger(__name__)
+
+SERVER_CACHE_MAX_USERS = 64
+
+_SVG_CONTENT_TYPE = "image/svg+xml; charset=utf-8"
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+# ── Cache ──────────────────────────────────────────────────────────────────────
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe LRU cache with per-entry expiry and single-flight misses."""
+
+    def __init__(
+        self,
+        ttl: float,
+        maxsize: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Hold up to `maxsize` entries, each fresh for `ttl` seconds of `clock`."""
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._inflight: dict[K, Future[tuple[V, float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: K, compute: Callable[[], V]) -> tuple[V, float]:
+        """Return `(value, expires_at)` for `key`, computing it on a miss.
+
+        Concurrent misses for the same key wait on one `compute()` call; its
+        exception propagates to every waiter and nothing is cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                return entry[1], entry[0]
+            future = self._inflight.get(key)
+            owner = future is None
+            if future is None:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            del self._inflight[key]
+        future.set_result((value, expires_at))
+        return value, expires_at
+
+
+# ── Service ────────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class _Snapshot:
+    """A fetched context plus the encoded cards rendered from it so far."""
+
+    ctx: CardContext
+    cards: dict[tuple[str, bool], tuple[bytes, str]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class CardService:
+    """Fetches, caches and renders cards for a fixed set of users."""
+
+    def __init__(
+        self,
+        configs: list[Config],
+        token: str,
+        styles: dict[str, CardStyle] | None = None,
+        store: HistoryStore | None = None,
+        ttl: float = SERVER_CACHE_TTL_SECONDS,
+        fetch_workers: int = FETCH_MAX_WORKERS,
+        compact_heatmap: bool = False,
+        steam_ttl: float = STEAM_CACHE_TTL_SECONDS,
+    ) -> None:
+        """Serve `styles` (default: every style) for `configs`.
+
+        Users are matched case-insensitively.
+        """
+        self._configs = {c["user"]["name"].lower(): c for c in configs}
+        self._styles = dict(CARD_STYLES) if styles is None else styles
+        self._token = token
+        self._store = store
+        self._fetch_workers = fetch_workers
+        self._compact_heatmap = compact_heatmap
+        self._steam_ttl = steam_ttl
+        self._snapshots: TTLCache[str, _Snapshot] = TTLCache(
+            ttl, max(SERVER_CACHE_MAX_USERS, len(configs))
+        )
+
+    def serves(self, user: str, style_name: str) -> bool:
+        """Return True if `user` is configured and `style_name` is registered."""
+        return user.lower() in self._configs and style_name in self._styles
+
+    def card(
+        self, user: str, style_name: str, background: bool = True
+    ) -> tuple[bytes, str, float]:
+        """Return `(body, etag, expires_at)` for `user`'s `style_name` card.
+
+        `body` is the UTF-8 SVG, encoded once per cached variant.
+
+        Raises `KeyError` for an unknown user or style (see `serves`).
+        """
+        config = self._configs[user.lower()]
+        style = self._styles[style_name]
+        snapshot, expires_at = self._snapshots.get(
+            user.lower(), lambda: self._fetch(config)
+        )
+        key = (style_name, background)
+        with snapshot.lock:
+            if key not in snapshot.cards:
+                chunks = render_card_chunks(style, snapshot.ctx, background)
+                body = b"".join(chunk.encode("utf-8") for chunk in chunks)
+                etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+                snapshot.cards[key] = (body, etag)
+            body, etag = snapshot.cards[key]
+        return body, etag, expires_at
+
+    def _fetch(self, config: Config) -> _Snapshot:
+        """Fetch a fresh context for `config`."""
+        logger.info("Fetching %s", config["user"]["name"])
+        ctx = fetch_card_context(
+            config,
+            self._styles,
+            self._token,
+            self._store,
+            self._fetch_workers,
+            self._compact_heatmap,
+            self._steam_ttl,
+            steam_background=True,
+        )
+        return _Snapshot(ctx)
+
+
+# ── HTTP ───────────────────────────────────────────────────────────────────────
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return True if an `If-None-Match` header value matches `etag`.
+
+    Uses the weak comparison RFC 9110 prescribes for `If-None-Match`: each
+    comma-separated entity tag is compared for equality with any `W/` prefix
+    dropped, and `*` matches any current representation.
+    """
+    tag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == tag:
+            return True
+    return False
+
+
+class _CardRequestHandler(BaseHTTPRequestHandler):
+    """Routes `GET|HEAD /<user>/<style>.svg` to the server's `CardService`."""
+
+    server: "CardServer"
+
+    def do_GET(self) -> None:
+        """Serve a card (or 304/404/502)."""
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        """Serve card headers only."""
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool) -> None:
+        """Resolve the request path and write the response."""
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        service = self.server.service
+        if (
+            len(parts) != 2
+            or not parts[1].endswith(".svg")
+            or not service.serves(parts[0], parts[1].removesuffix(".svg"))
+        ):
+            self._send_error(HTTPStatus.NOT_FOUND, send_body)
+            return
+        user, style_name = parts[0], parts[1].removesuffix(".svg")
+        background = parse_qs(url.query).get("background", ["1"])[-1] != "0"
+        try:
+            body, etag, expires_at = service.card(user, style_name, background)
+        except Exception as e:
+            logger.error("Failed to render %s/%s: %s", user, style_name, e)
+            self._send_error(HTTPStatus.BAD_GATEWAY, send_body)
+            return
+
+        max_age = max(0, int(expires_at - time.monotonic()))
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+        if etag_matches(self.headers.get("If-None-Match", ""), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", _SVG_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, send_body: bool) -> None:
+        """Send a short plain-text error response."""
+        body = f"{status.value} {status.phrase}\n".encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Route access logs through `logging` instead of stderr."""
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+class CardServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to a `CardService`."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: CardService) -> None:
+        """Listen on `address` and serve cards from `service`."""
+        super().__init__(address, _CardRequestHandler)
+        self.service = service
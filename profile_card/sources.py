@@ -0,0 +1,147 @@
+"""Concurrent data-source graph for the fetch phase.
+
+Each `DataSource` names the sources it depends on; `fetch_sources` starts
+every source as soon as its dependencies have resolved, so independent
+sources (GitHub history, Steam recent games, …) overlap instead of running
+back to back.
+
+Non-obvious invariants:
+    - A source's `timeout` counts from when it starts, not from the call.
+    - An optional source (one with a fallback) that raises or times out
+      resolves to its fallback with a warning; a required one propagates.
+    - Timed-out fetches are abandoned, not interrupted: their worker thread
+      finishes in the background (bounded by the HTTP request timeouts).
+"""
+
+import logging
+import math
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass
+
+from profile_card.tracing import worker_pool
+
+logger = logging.getLogger(__name__)
+
+_REQUIRED = object()
+
+
+@dataclass(frozen=True)
+class DataSource:
+    """One fetchable input to a `CardContext`.
+
+    Attributes:
+        name: Key of the result in `fetch_sources`' output.
+        fetch: Called with `{dep_name: result}` for each of `deps`.
+        deps: Names of sources whose results `fetch` needs.
+        timeout: Seconds allowed once started; None for no limit.
+        fallback: Result used when an optional source fails or times out;
+            leave unset for a required source.
+    """
+
+    name: str
+    fetch: Callable[[Mapping[str, object]], object]
+    deps: tuple[str, ...] = ()
+    timeout: float | None = None
+    fallback: object = _REQUIRED
+
+    @property
+    def optional(self) -> bool:
+        """Whether failures degrade to `fallback` instead of propagating."""
+        return self.fallback is not _REQUIRED
+
+    def degrade(self, reason: str) -> object:
+        """Return `fallback` after logging why, or raise if required."""
+        if not self.optional:
+            raise TimeoutError(f"Data source '{self.name}' {reason}")
+        logger.warning(
+            "Data source '%s' %s — using fallback %r", self.name, reason, self.fallback
+        )
+        return self.fallback
+
+
+_Running = dict[Future[object], tuple[DataSource, float]]
+
+
+def _start_ready(
+    pool: Executor,
+    pending: list[DataSource],
+    running: _Running,
+    results: dict[str, object],
+) -> None:
+    """Submit every pending source whose dependencies have all resolved."""
+    for source in [s for s in pending if all(d in results for d in s.deps)]:
+        pending.remove(source)
+        deadline = (
+            time.monotonic() + source.timeout
+            if source.timeout is not None
+            else math.inf
+        )
+        inputs = {d: results[d] for d in source.deps}
+        running[pool.submit(source.fetch, inputs)] = (source, deadline)
+
+
+def _collect(
+    done: set[Future[object]], running: _Running, results: dict[str, object]
+) -> None:
+    """Move finished sources from `running` into `results`."""
+    for future in done:
+        source, _ = running.pop(future)
+        try:
+            results[source.name] = future.result()
+        except Exception as e:
+            if not source.optional:
+                raise
+            results[source.name] = source.degrade(f"failed: {e}")
+
+
+def _expire(running: _Running, results: dict[str, object]) -> None:
+    """Abandon running sources past their deadline, resolving them to fallbacks."""
+    now = time.monotonic()
+    for future, (source, deadline) in list(running.items()):
+        if deadline <= now:
+            del running[future]
+            future.cancel()
+            results[source.name] = source.degrade(
+                f"timed out after {source.timeout:g}s"
+            )
+
+
+def fetch_sources(sources: list[DataSource]) -> dict[str, object]:
+    """Resolve every source concurrently, respecting `deps`; return results by name.
+
+    Raises `ValueError` on unknown or cyclic dependencies, and the first
+    required source's exception (or `TimeoutError`) otherwise.
+    """
+    names = {s.name for s in sources}
+    for source in sources:
+        unknown = set(source.deps) - names
+        if unknown:
+            raise ValueError(
+                f"Data source '{source.name}' depends on unknown {sorted(unknown)}"
+            )
+
+    pending = list(sources)
+    results: dict[str, object] = {}
+    running: _Running = {}
+    pool = worker_pool(max(1, len(sources)))
+    try:
+        while pending or running:
+            _start_ready(pool, pending, running, results)
+            if not running:
+                raise ValueError(
+                    f"Cyclic data source dependencies: {[s.name for s in pending]}"
+                )
+            next_deadline = min(deadline for _, deadline in running.values())
+            timeout = (
+                None
+                if next_deadline == math.inf
+                else max(0.0, next_deadline - time.monotonic())
+            )
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            _collect(done, running, results)
+            _expire(running, results)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return results
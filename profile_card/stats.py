@@ -0,0 +1,140 @@
+"""Single-pass contribution statistics.
+
+`StatsAccumulator` computes total, first commit, and current/longest streak
+(with bounds) in one linear scan over a day-ordered `ContributionSeries`, and
+can be checkpointed so later runs only feed the days that arrived since.
+
+Non-obvious invariants:
+    - Days must be fed contiguously; `feed` raises `ValueError` on a gap or
+      overlap so a stale checkpoint can't silently skew streaks.
+    - Today is not fed when it has zero contributions — the day may not be
+      complete (see `compute_stats`).
+"""
+
+import logging
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, replace
+from datetime import date
+
+from profile_card.series import ContributionSeries
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatsAccumulator:
+    """Running stats over days fed so far; all days are date ordinals.
+
+    Attributes:
+        next_ordinal: Day after the last fed day, or None before any feed.
+        total: Sum of fed counts.
+        first_commit: First fed day with a non-zero count.
+        current_streak: Length of the run of non-zero days ending at the last
+            fed day.
+        streak_start: First day of that run, or None when it is empty.
+        longest_streak: Longest run of non-zero days seen.
+        longest_start: First day of the longest run (earliest on ties).
+        longest_end: Last day of the longest run.
+    """
+
+    next_ordinal: int | None = None
+    total: int = 0
+    first_commit: int | None = None
+    current_streak: int = 0
+    streak_start: int | None = None
+    longest_streak: int = 0
+    longest_start: int | None = None
+    longest_end: int | None = None
+
+    def feed(self, start: int, counts: Sequence[int]) -> None:
+        """Feed `counts` for consecutive days from ordinal `start`."""
+        if self.next_ordinal is not None and start != self.next_ordinal:
+            raise ValueError(
+                f"Non-contiguous feed: expected day {self.next_ordinal}, got {start}"
+            )
+        total = self.total
+        first_commit = self.first_commit
+        current = self.current_streak
+        streak_start = self.streak_start
+        longest = self.longest_streak
+        longest_start = self.longest_start
+        longest_end = self.longest_end
+
+        for ordinal, count in enumerate(counts, start):
+            if count > 0:
+                total += count
+                if first_commit is None:
+                    first_commit = ordinal
+                if current == 0:
+                    streak_start = ordinal
+                current += 1
+                if current > longest:
+                    longest = current
+                    longest_start = streak_start
+                    longest_end = ordinal
+            else:
+                current = 0
+                streak_start = None
+
+        self.total = total
+        self.first_commit = first_commit
+        self.current_streak = current
+        self.streak_start = streak_start
+        self.longest_streak = longest
+        self.longest_start = longest_start
+        self.longest_end = longest_end
+        self.next_ordinal = start + len(counts)
+
+    def feed_until(self, series: ContributionSeries, end: int) -> None:
+        """Feed `series` days from where this accumulator left off up to `end`.
+
+        `end` is an exclusive ordinal, clamped to the series. Raises
+        `ValueError` if the series doesn't cover the next expected day.
+        """
+        begin = series.start if self.next_ordinal is None else self.next_ordinal
+        if begin < series.start:
+            raise ValueError(
+                f"Series starts at day {series.start}, accumulator expects {begin}"
+            )
+        end = min(end, series.end)
+        if end > begin:
+            self.feed(begin, series.values[begin - series.start : end - series.start])
+
+    def copy(self) -> "StatsAccumulator":
+        """Return an independent copy (e.g. to extend past a checkpoint)."""
+        return replace(self)
+
+    def to_state(self) -> dict[str, int | None]:
+        """Serialise to a JSON-safe dict (see `from_state`)."""
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, state: dict[str, int | None]) -> "StatsAccumulator":
+        """Rebuild an accumulator saved with `to_state`."""
+        return cls(**state)  # type: ignore[arg-type]
+
+
+def compute_stats(
+    series: ContributionSeries,
+    today: date,
+    checkpoint: StatsAccumulator | None = None,
+) -> StatsAccumulator:
+    """Return stats over `series`, resuming from `checkpoint` when given.
+
+    Today is skipped when it is the last day and has zero contributions.
+    `checkpoint` is not modified.
+    """
+    acc = checkpoint.copy() if checkpoint is not None else StatsAccumulator()
+    end = series.end
+    if end - 1 == today.toordinal() and series.values and series.values[-1] == 0:
+        logger.info(
+            "Excluding today (%s) from streak — zero contributions so far", today
+        )
+        end -= 1
+    acc.feed_until(series, end)
+    return acc
+
+
+def ordinal_to_iso(ordinal: int | None) -> str | None:
+    """Format a day ordinal as an ISO date, passing None through."""
+    return date.fromordinal(ordinal).isoformat() if ordinal is not None else None
@@ -0,0 +1,150 @@
+"""Persistent local contribution history (SQLite).
+
+Keeps every fetched `date → count` row keyed by user so
+`fetch_contributions_from_github` only has to refetch the trailing window that
+GitHub can still revise, plus any gaps, instead of the full history since 2018.
+Also keeps a per-user stats checkpoint covering the days before that window,
+the last fetched public repo count, and the last Steam recent-games answer per
+Steam ID — together, everything a card needs to render offline.
+
+Non-obvious invariants:
+    - Usernames are stored lower-cased — GitHub logins are case-insensitive.
+    - Zero-count days are stored too; a missing row means "never fetched".
+    - A cached Steam game of NULL means "no recent games", not "unknown".
+    - One connection is shared across threads (batch mode) behind a lock.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+HISTORY_DB_PATH = Path(".cache/profile-card/history.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contributions (
+    user  TEXT    NOT NULL,
+    date  TEXT    NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats_checkpoints (
+    user  TEXT NOT NULL PRIMARY KEY,
+    state TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS github_profiles (
+    user         TEXT    NOT NULL PRIMARY KEY,
+    public_repos INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS steam_games (
+    steam_id   TEXT NOT NULL PRIMARY KEY,
+    game       TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class HistoryStore:
+    """SQLite-backed `(user, date) → count` store. Usable as a context manager."""
+
+    def __init__(self, path: Path = HISTORY_DB_PATH) -> None:
+        """Open (and create if needed) the database at `path`."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "HistoryStore":
+        """Return self; the connection is closed on exit."""
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        """Close the underlying connection."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self._conn.close()
+
+    def load(self, user: str) -> dict[str, int]:
+        """Return every stored `ISO date → count` row for `user`, date-ordered."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, count FROM contributions WHERE user = ? ORDER BY date",
+                (user.lower(),),
+            )
+            return dict(rows)
+
+    def save(self, user: str, contributions: dict[str, int]) -> None:
+        """Upsert `contributions` for `user` in a single transaction."""
+        key = user.lower()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO contributions (user, date, count) "
+                "VALUES (?, ?, ?)",
+                ((key, date, count) for date, count in contributions.items()),
+            )
+
+    def load_checkpoint(self, user: str) -> dict[str, int | None] | None:
+        """Return the saved stats checkpoint state for `user`, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM stats_checkpoints WHERE user = ?", (user.lower(),)
+            ).fetchone()
+        if row is None:
+            return None
+        state: dict[str, int | None] = json.loads(row[0])
+        return state
+
+    def save_checkpoint(self, user: str, state: dict[str, int | None]) -> None:
+        """Replace the stats checkpoint state for `user`."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stats_checkpoints (user, state) VALUES (?, ?)",
+                (user.lower(), json.dumps(state)),
+            )
+
+    def load_public_repos(self, user: str) -> int | None:
+        """Return the last fetched public repo count for `user`, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT public_repos FROM github_profiles WHERE user = ?",
+                (user.lower(),),
+            ).fetchone()
+        return int(row[0]) if row is not None else None
+
+    def save_public_repos(self, user: str, public_repos: int) -> None:
+        """Replace the public repo count for `user`."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO github_profiles (user, public_repos) "
+                "VALUES (?, ?)",
+                (user.lower(), public_repos),
+            )
+
+    def load_steam_game(self, steam_id: str) -> tuple[str | None, float] | None:
+        """Return the cached `(game, fetched_at)` for `steam_id`, if any.
+
+        `fetched_at` is a Unix timestamp; `game` is None for "no recent games".
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT game, fetched_at FROM steam_games WHERE steam_id = ?",
+                (steam_id,),
+            ).fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def save_steam_game(
+        self, steam_id: str, game: str | None, fetched_at: float
+    ) -> None:
+        """Replace the cached Steam answer for `steam_id`."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO steam_games (steam_id, game, fetched_at) "
+                "VALUES (?, ?, ?)",
+                (steam_id, game, fetched_at),
+            )
@@ -0,0 +1,220 @@
+"""Compiled single-pass templates.
+
+A template is compiled once into alternating literal chunks and named holes
+(`{{placeholder}}` tokens plus the marker comments it is compiled with), so
+each render is a single `"".join` whose cost grows with output size rather
+than with keys × template size.
+
+Non-obvious invariants:
+    - Values are inserted verbatim and never rescanned, so a value containing
+      `{{x}}` stays literal (same as the previous replace-per-key passes, as
+      long as no value contains another key).
+    - With `strip_trailing_ws`, trailing spaces/tabs are removed from literal
+      lines at compile time; the whitespace in front of a hole is kept aside
+      and trimmed at render time only if nothing but holes follows it on the
+      line (e.g. an indented `<!-- Background -->` rendered empty). Inner
+      lines of values are not scanned — callers pre-strip multi-line values.
+    - `render_slotted` leaves every hole of the slot's run open, not just the
+      slot, since a run is trimmed as a unit; the rest of the document is
+      rendered once and shared by all fills.
+    - A hole value may be a tuple of chunks (e.g. a large marker built line
+      by line); chunks are emitted as separate parts and never joined, and
+      trimming treats them as their concatenation.
+"""
+
+import re
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+
+PLACEHOLDER_PATTERN = r"\{\{[^}]+\}\}"
+
+_TRAILING_WS_RE = re.compile(r"[ \t]+(?=\n)")
+_LEAD_WS_RE = re.compile(r"[ \t]+\Z")
+
+# A hole's value: one string, or chunks emitted in order without being joined.
+HoleValue = str | tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Template split into `literals` around `holes`, one more literal than holes.
+
+    Attributes:
+        literals: Static text chunks; `literals[i]` precedes `holes[i]`.
+        holes: Hole names in document order (placeholders and markers).
+        leads: Whitespace moved out of the literal before each hole; empty
+            unless compiled with `strip_trailing_ws`.
+        placeholders: Distinct `{{...}}` names the template references.
+        markers: Distinct marker comments the template references.
+        strip_trailing_ws: Whether rendered holes are right-trimmed at line end.
+    """
+
+    literals: tuple[str, ...]
+    holes: tuple[str, ...]
+    leads: tuple[str, ...]
+    placeholders: frozenset[str]
+    markers: frozenset[str]
+    strip_trailing_ws: bool
+
+    def missing(self, values: Mapping[str, HoleValue]) -> set[str]:
+        """Return referenced hole names that `values` doesn't provide."""
+        return {name for name in self.placeholders | self.markers if name not in values}
+
+    def render(self, values: Mapping[str, HoleValue]) -> str:
+        """Fill every hole from `values` in one pass; unknown holes stay literal."""
+        return "".join(self.render_chunks(values))
+
+    def render_chunks(self, values: Mapping[str, HoleValue]) -> list[str]:
+        """Like `render`, but return the document's parts unjoined, for streaming."""
+        return [self.literals[0], *self._render_holes(values, 0, len(self.holes))]
+
+    def render_slotted(
+        self, values: Mapping[str, HoleValue], slot: str
+    ) -> "SlottedRender":
+        """Render everything except the hole(s) named `slot` (see `SlottedRender`).
+
+        The entry for `slot` in `values`, if any, is ignored.
+        """
+        indices = [i for i, name in enumerate(self.holes) if name == slot]
+        if not indices:
+            head = tuple(self.render_chunks(values))
+            return SlottedRender(self, slot, head, (), {}, 0, 0)
+        # Widen to whole runs: trimming depends on every hole in a run.
+        start = indices[0]
+        while start > 0 and not self.literals[start]:
+            start -= 1
+        stop = indices[-1] + 1
+        while stop < len(self.holes) and not self.literals[stop]:
+            stop += 1
+        head = (self.literals[0], *self._render_holes(values, 0, start))
+        tail = tuple(self._render_holes(values, stop, len(self.holes)))
+        run_values = {
+            name: values[name] for name in self.holes[start:stop] if name in values
+        }
+        return SlottedRender(self, slot, head, tail, run_values, start, stop)
+
+    def _render_holes(
+        self, values: Mapping[str, HoleValue], start: int, stop: int
+    ) -> list[str]:
+        """Render `holes[start:stop]`, each run followed by its literal.
+
+        `start` must begin a run and `stop - 1` end one (or `stop == start`).
+        """
+        parts: list[str] = []
+        # Holes rendered since the last non-empty literal; right-trimmed as one
+        # run when the next literal starts a new line (or the document ends).
+        run: list[str] = []
+        last = len(self.holes) - 1
+        for i in range(start, stop):
+            name, lead, literal = self.holes[i], self.leads[i], self.literals[i + 1]
+            value = values.get(name, name)
+            run.append(lead)
+            if isinstance(value, str):
+                if self.strip_trailing_ws and value[:1] == "\n":
+                    _rstrip_run(run)
+                run.append(value)
+            else:
+                if self.strip_trailing_ws and _first_char(value) == "\n":
+                    _rstrip_run(run)
+                run += value
+            if not literal and i != last:
+                continue
+            if self.strip_trailing_ws and (not literal or literal[0] == "\n"):
+                _rstrip_run(run)
+            parts += run
+            parts.append(literal)
+            run = []
+        return parts
+
+
+@dataclass(frozen=True)
+class SlottedRender:
+    """A template rendered once with one hole (the slot) left open.
+
+    `head` and `tail` hold the rendered parts before and after the run of
+    holes around the slot (everything up to the next non-empty literal);
+    `fill` re-renders only that run, so each variant costs one join and
+    trims whitespace exactly like `CompiledTemplate.render`. Parts stay
+    unjoined so variants share them instead of copying the document twice.
+    """
+
+    template: CompiledTemplate
+    slot: str
+    head: tuple[str, ...]
+    tail: tuple[str, ...]
+    run_values: Mapping[str, HoleValue]
+    start: int
+    stop: int
+
+    def fill(self, value: HoleValue) -> str:
+        """Return the full document with `value` in the slot."""
+        return "".join(self.chunks(value))
+
+    def chunks(self, value: HoleValue) -> list[str]:
+        """Like `fill`, but return the document's parts unjoined, for streaming."""
+        run = self.template._render_holes(
+            {**self.run_values, self.slot: value}, self.start, self.stop
+        )
+        return [*self.head, *run, *self.tail]
+
+
+def _first_char(chunks: tuple[str, ...]) -> str:
+    """Return the first character of the concatenated `chunks` ("" if empty)."""
+    return next((chunk[0] for chunk in chunks if chunk), "")
+
+
+def _rstrip_run(run: list[str]) -> None:
+    """Strip trailing spaces/tabs off the concatenation of `run`, in place."""
+    while run:
+        tail = run[-1].rstrip(" \t")
+        if tail:
+            run[-1] = tail
+            return
+        run.pop()
+
+
+def compile_template(
+    text: str, markers: Iterable[str] = (), strip_trailing_ws: bool = False
+) -> CompiledTemplate:
+    """Compile `text` into a `CompiledTemplate`.
+
+    Holes are every `{{...}}` token plus each exact string in `markers`
+    (typically `<!-- Marker -->` comments). With `strip_trailing_ws`, the
+    render output matches stripping trailing blanks from every line of the
+    naive replace-per-key result.
+    """
+    marker_set = frozenset(markers)
+    alternatives = [re.escape(m) for m in sorted(marker_set, key=len, reverse=True)]
+    hole_re = re.compile("|".join([PLACEHOLDER_PATTERN, *alternatives]))
+
+    literals: list[str] = []
+    holes: list[str] = []
+    leads: list[str] = []
+    pos = 0
+    for match in hole_re.finditer(text):
+        literal = text[pos : match.start()]
+        lead = ""
+        if strip_trailing_ws:
+            literal = _TRAILING_WS_RE.sub("", literal)
+            lead_match = _LEAD_WS_RE.search(literal)
+            if lead_match:
+                lead = lead_match.group()
+                literal = literal[: lead_match.start()]
+        literals.append(literal)
+        holes.append(match.group())
+        leads.append(lead)
+        pos = match.end()
+
+    tail = text[pos:]
+    if strip_trailing_ws:
+        tail = _LEAD_WS_RE.sub("", _TRAILING_WS_RE.sub("", tail))
+    literals.append(tail)
+
+    return CompiledTemplate(
+        literals=tuple(literals),
+        holes=tuple(holes),
+        leads=tuple(leads),
+        placeholders=frozenset(h for h in holes if h not in marker_set),
+        markers=frozenset(h for h in holes if h in marker_set),
+        strip_trailing_ws=strip_trailing_ws,
+    )
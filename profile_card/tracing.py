@@ -0,0 +1,186 @@
+"""Structured timing spans and whole-run profiling.
+
+`span("name", key=value)` times a block and, once `enable_tracing` has been
+called, writes one JSON object per finished span (JSON Lines) to the trace
+sink. `profile_run` wraps a whole run in cProfile + tracemalloc.
+
+Non-obvious invariants:
+    - With tracing disabled, `span` returns a shared no-op context; the hot
+      paths (per-resolver, per-file) pay one global read and a call.
+    - Spans nest per thread/task via a `ContextVar`; spans started on pool
+      threads have no parent because context isn't propagated to them.
+    - Attributes set through `Span.set` after entry are included, e.g. bytes
+      received once a response arrives; the span's own fields (`name`, `id`,
+      `start`, …) win over attributes of the same name.
+    - cProfile only sees the thread that enabled it, so while `profile_run`
+      is active `worker_pool` runs every pooled task inline on the submitting
+      thread. The profiled run is serial: source timeouts can't cut a fetch
+      short and nothing overlaps.
+"""
+
+import contextvars
+import itertools
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import IO, Any, ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(".cache/profile-card")
+PROFILE_TOP_ALLOCATIONS = 10
+
+_sink: IO[str] | None = None
+_sink_lock = threading.Lock()
+_ids = itertools.count(1)
+_current: contextvars.ContextVar[int | None] = contextvars.ContextVar(
+    "current_span", default=None
+)
+_profiling = False
+
+_P = ParamSpec("_P")
+_T = TypeVar("_T")
+
+
+class Span:
+    """A running span; `set` adds attributes reported when it finishes."""
+
+    __slots__ = ("attrs", "id", "name", "parent", "start")
+
+    def __init__(self, name: str, attrs: dict[str, object]) -> None:
+        """Start timing `name` under the current span."""
+        self.name = name
+        self.attrs = attrs
+        self.id = next(_ids)
+        self.parent = _current.get()
+        self.start = time.time()
+
+    def set(self, **attrs: object) -> None:
+        """Add or overwrite attributes."""
+        self.attrs.update(attrs)
+
+
+_NO_SPAN: AbstractContextManager[Span | None] = nullcontext(None)
+
+
+def enable_tracing(sink: IO[str]) -> None:
+    """Write finished spans to `sink` as JSON Lines from now on."""
+    global _sink
+    _sink = sink
+
+
+def disable_tracing() -> None:
+    """Stop emitting spans (the sink is not closed)."""
+    global _sink
+    _sink = None
+
+
+def span(name: str, **attrs: object) -> AbstractContextManager[Span | None]:
+    """Time the enclosed block as `name`; yields the `Span`, or None if disabled."""
+    if _sink is None:
+        return _NO_SPAN
+    return _traced(name, attrs)
+
+
+@contextmanager
+def _traced(name: str, attrs: dict[str, object]) -> Iterator[Span]:
+    """Run a block as a span and emit it on exit (also on error)."""
+    current = Span(name, attrs)
+    token = _current.set(current.id)
+    start = time.perf_counter()
+    error: str | None = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        _current.reset(token)
+        _emit(current, duration_ms, error)
+
+
+def _emit(current: Span, duration_ms: float, error: str | None) -> None:
+    """Serialise one finished span to the sink."""
+    record: dict[str, Any] = {
+        **current.attrs,
+        "name": current.name,
+        "id": current.id,
+        "parent": current.parent,
+        "start": round(current.start, 6),
+        "duration_ms": round(duration_ms, 3),
+        "thread": threading.current_thread().name,
+    }
+    if error is not None:
+        record["error"] = error
+    line = json.dumps(record, default=str)
+    sink = _sink
+    if sink is None:
+        return
+    with _sink_lock:
+        sink.write(line + "\n")
+        sink.flush()
+
+
+@contextmanager
+def profile_run(out_dir: Path = PROFILE_DIR) -> Iterator[None]:
+    """Profile the enclosed run with cProfile and tracemalloc.
+
+    Writes `out_dir/profile.pstats` (open with `python -m pstats`) and logs
+    the peak traced memory plus the top allocation sites. Pooled work runs
+    inline on the calling thread meanwhile (see `worker_pool`).
+    """
+    # Imported on use: both are only needed for --profile runs.
+    import cProfile
+    import tracemalloc
+
+    global _profiling
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    _profiling = True
+    try:
+        yield
+    finally:
+        _profiling = False
+        profiler.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        stats_path = out_dir / "profile.pstats"
+        profiler.dump_stats(stats_path)
+        logger.info(
+            "Profile: %s written; peak traced memory %.1f MiB",
+            stats_path,
+            peak / 2**20,
+        )
+        for stat in snapshot.statistics("lineno")[:PROFILE_TOP_ALLOCATIONS]:
+            logger.info("Profile: %s", stat)
+
+
+class _InlineExecutor(Executor):
+    """Runs each task to completion on the submitting thread."""
+
+    def submit(
+        self, fn: Callable[_P, _T], /, *args: _P.args, **kwargs: _P.kwargs
+    ) -> Future[_T]:
+        """Call `fn` now and return its already-resolved future."""
+        future: Future[_T] = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def worker_pool(max_workers: int) -> Executor:
+    """Return a `max_workers` thread pool, or an inline one under `profile_run`."""
+    if _profiling:
+        return _InlineExecutor()
+    return ThreadPoolExecutor(max_workers=max_workers)
@@ -0,0 +1,293 @@
+"""Record/replay transports for the shared HTTP session.
+
+`RecordingAdapter` sends requests normally and appends each final response
+to a `Cassette` file; `ReplayAdapter` answers from that file without any
+network, optionally adding latency and injected failures. Install either
+with `fetchers.use_transport` to profile or load-test the fetch phase
+offline and deterministically.
+
+Non-obvious invariants:
+    - Credentials are never written: request headers aren't stored, and the
+      `key` query parameter (Steam API key) is dropped from recorded URLs.
+    - Requests match on method, URL and body with ISO timestamps truncated
+      to dates, so a cassette replays across runs on the same day. Failing
+      that, a request falls back to the latest recording with the same
+      method, URL and GraphQL query text — same response shape, older data.
+    - Injected failures go through the session's urllib3 `Retry` policy
+      (backoff, `Retry-After`, retry counts) exactly like real ones. The
+      failure draw is seeded by the request key and attempt number, so it
+      doesn't depend on thread scheduling.
+"""
+
+import io
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import TypedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ProtocolError
+from urllib3.response import HTTPResponse
+from urllib3.util.retry import Retry
+
+from profile_card.fetchers import (
+    CONNECTION_ERROR_STATUS,
+    HTTP_POOL_MAXSIZE,
+    http_retry_policy,
+)
+from profile_card.manifest import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+# Query parameters never written to (or matched from) a cassette.
+SECRET_QUERY_PARAMS = frozenset({"key"})
+
+_TIMESTAMP_RE = re.compile(r"(\d{4}-\d{2}-\d{2})T[0-9:.]+(?:Z|[+-]\d{2}:\d{2})?")
+
+# `HTTPAdapter.send` argument types.
+_Timeout = float | tuple[float, float] | tuple[float, None] | None
+_Cert = bytes | str | tuple[bytes | str, bytes | str] | None
+
+
+class Interaction(TypedDict):
+    """One recorded request/response pair (see `Cassette`)."""
+
+    key: str
+    loose_key: str
+    method: str
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: str
+
+
+# ── Cassette ───────────────────────────────────────────────────────────────────
+
+
+def _redacted_url(url: str) -> str:
+    """Return `url` without secret query params and with a sorted query string."""
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query) if k not in SECRET_QUERY_PARAMS
+    )
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _body_text(request: requests.PreparedRequest) -> str:
+    """Return the request body as text ("" for none)."""
+    body = request.body
+    if body is None:
+        return ""
+    return body.decode("utf-8") if isinstance(body, bytes) else str(body)
+
+
+def request_keys(request: requests.PreparedRequest) -> tuple[str, str]:
+    """Return the `(exact, loose)` match keys for `request`.
+
+    The exact key covers method, redacted URL and body (timestamps cut to
+    dates); the loose key keeps only the GraphQL `query` text of JSON bodies.
+    """
+    method = request.method or "GET"
+    url = _redacted_url(request.url or "")
+    body = _body_text(request)
+    try:
+        query = json.loads(body).get("query", "") if body else ""
+    except (ValueError, AttributeError):
+        query = body
+    dated_body = _TIMESTAMP_RE.sub(r"\1", body)
+    return f"{method} {url} {dated_body}", f"{method} {url} {query}"
+
+
+class Cassette:
+    """Recorded interactions persisted as one JSON file. Thread-safe."""
+
+    def __init__(self, path: Path) -> None:
+        """Load `path` if it exists; a missing file starts an empty cassette."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._interactions: list[Interaction] = []
+        if path.is_file():
+            self._interactions = json.loads(path.read_text(encoding="utf-8"))[
+                "interactions"
+            ]
+
+    def __len__(self) -> int:
+        """Number of recorded interactions."""
+        return len(self._interactions)
+
+    def add(
+        self, request: requests.PreparedRequest, response: requests.Response
+    ) -> None:
+        """Record `response` for `request` and save the cassette atomically."""
+        key, loose_key = request_keys(request)
+        interaction: Interaction = {
+            "key": key,
+            "loose_key": loose_key,
+            "method": request.method or "GET",
+            "url": _redacted_url(request.url or ""),
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": response.text,
+        }
+        with self._lock:
+            self._interactions.append(interaction)
+            text = json.dumps({"interactions": self._interactions}, indent=2) + "\n"
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(self.path, text)
+
+    def find(self, request: requests.PreparedRequest) -> Interaction | None:
+        """Return the latest exact match for `request`, else the latest loose one."""
+        key, loose_key = request_keys(request)
+        with self._lock:
+            interactions = list(reversed(self._interactions))
+        for interaction in interactions:
+            if interaction["key"] == key:
+                return interaction
+        for interaction in interactions:
+            if interaction["loose_key"] == loose_key:
+                logger.debug("Replay: loose match for %s", interaction["url"])
+                return interaction
+        return None
+
+
+# ── Adapters ───────────────────────────────────────────────────────────────────
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Default transport that also records every final response to a cassette."""
+
+    def __init__(self, cassette: Cassette) -> None:
+        """Record into `cassette`, with the session's usual retries and pooling."""
+        super().__init__(
+            max_retries=http_retry_policy(), pool_maxsize=HTTP_POOL_MAXSIZE
+        )
+        self.cassette = cassette
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: _Timeout = None,
+        verify: bool | str = True,
+        cert: _Cert = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        """Send `request` over the network and record the response."""
+        response = super().send(request, stream, timeout, verify, cert, proxies)
+        self.cassette.add(request, response)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Offline transport serving recorded responses with optional faults.
+
+    Attributes:
+        latency: Mean seconds added per attempt (uniform in 0.5–1.5×).
+        error_rate: Probability that an attempt fails with `error_status`.
+        error_status: HTTP status of injected failures, or
+            `CONNECTION_ERROR_STATUS` for a dropped connection.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+    ) -> None:
+        """Replay from `cassette` under the session's usual retry policy."""
+        super().__init__(max_retries=http_retry_policy())
+        self.cassette = cassette
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._seed = seed
+        self._attempts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _draw(self, key: str) -> random.Random:
+        """Return an RNG seeded by `key` and how often it was attempted before."""
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+        return random.Random(f"{self._seed}:{attempt}:{key}")
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: _Timeout = None,
+        verify: bool | str = True,
+        cert: _Cert = None,
+        proxies: Mapping[str, str] | None = None,
+    ) -> requests.Response:
+        """Answer `request` from the cassette, applying latency and faults.
+
+        Raises `requests.ConnectionError` when nothing was recorded for it, or
+        when injected connection failures exhaust the retries.
+        """
+        interaction = self.cassette.find(request)
+        if interaction is None:
+            raise requests.ConnectionError(
+                f"No recorded response for {request.method} "
+                f"{_redacted_url(request.url or '')}",
+                request=request,
+            )
+        method = request.method or "GET"
+        key = request_keys(request)[0]
+        retries: Retry = self.max_retries
+        while True:
+            rng = self._draw(key)
+            if self.latency:
+                time.sleep(self.latency * rng.uniform(0.5, 1.5))
+            failed = rng.random() < self.error_rate
+            if failed and self.error_status == CONNECTION_ERROR_STATUS:
+                try:
+                    retries = retries.increment(
+                        method, request.url, error=ProtocolError("injected failure")
+                    )
+                except (MaxRetryError, ProtocolError) as e:
+                    raise requests.ConnectionError(e, request=request) from e
+                retries.sleep()
+                continue
+            raw = _raw_response(interaction, self.error_status if failed else None)
+            if not retries.is_retry(method, raw.status, "Retry-After" in raw.headers):
+                break
+            try:
+                retries = retries.increment(method, request.url, response=raw)
+            except MaxRetryError:
+                break  # raise_on_status=False: hand back the last response
+            retries.sleep(raw)
+        raw.retries = retries
+        return self.build_response(request, raw)
+
+
+def _raw_response(interaction: Interaction, status: int | None = None) -> HTTPResponse:
+    """Build a urllib3 response from `interaction`, or an empty `status` failure."""
+    headers: Mapping[str, str] = interaction["headers"]
+    body = interaction["body"].encode("utf-8")
+    if status is not None:
+        headers, body = {}, b""
+    else:
+        status = interaction["status"]
+    # Bodies are stored decoded; drop encodings that no longer apply.
+    headers = {
+        k: v
+        for k, v in headers.items()
+        if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+    }
+    return HTTPResponse(
+        body=io.BytesIO(body),
+        headers=headers,
+        status=status,
+        preload_content=False,
+        decode_content=False,
+    )
@@ -0,0 +1,168 @@
+"""Watch mode: re-render cards as their input files change.
+
+`CardWatcher` keeps one fetched `CardContext` in memory and polls the active
+styles' templates and backgrounds plus `config.json`. Each change re-renders
+only the styles that read the changed file, so an edit reaches the output
+within one poll interval plus the render itself — no refetch.
+
+Non-obvious invariants:
+    - Files are compared by `(mtime_ns, size, inode)`, so editors that save
+      through a temp file + rename are caught; polling needs nothing beyond
+      the standard library and works the same on every platform.
+    - A `config.json` change rebuilds the context from the in-memory data
+      (links, display name, heatmap range, …) and re-renders every active
+      style; only a new user name or Steam ID fetches again.
+    - A failed re-render (half-saved file, invalid JSON, template error) is
+      logged and the loop keeps watching; the next save retries.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from profile_card.cards import CardContext, CardStyle
+from profile_card.config import CONFIG_PATH, Config
+from profile_card.manifest import BuildManifest
+from profile_card.pipeline import (
+    DOCS_DIR,
+    RENDER_MAX_WORKERS,
+    build_card_context,
+    invalidate_assets,
+    render_styles,
+    style_inputs,
+)
+
+logger = logging.getLogger(__name__)
+
+WATCH_POLL_SECONDS = 0.2
+
+_Signature = tuple[int, int, int] | None
+
+
+def _signature(path: Path) -> _Signature:
+    """Return `path`'s `(mtime_ns, size, inode)`, or None if it doesn't exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class FileWatcher:
+    """Polls a fixed set of files; `changes` reports which changed since last call."""
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        """Record the current state of `paths` as the baseline."""
+        self._signatures = {path: _signature(path) for path in paths}
+
+    def __len__(self) -> int:
+        """Number of watched files."""
+        return len(self._signatures)
+
+    def changes(self) -> set[Path]:
+        """Return the files modified, created or removed since the last call."""
+        changed = set()
+        for path, old in self._signatures.items():
+            new = _signature(path)
+            if new != old:
+                self._signatures[path] = new
+                changed.add(path)
+        return changed
+
+
+class CardWatcher:
+    """Re-renders one user's active styles whenever their inputs change."""
+
+    def __init__(
+        self,
+        ctx: CardContext,
+        active_styles: dict[str, CardStyle],
+        reload_config: Callable[[], Config],
+        refetch: Callable[[Config], CardContext],
+        out_root: Path = DOCS_DIR,
+        manifest: BuildManifest | None = None,
+        jobs: int = RENDER_MAX_WORKERS,
+        config_path: Path = CONFIG_PATH,
+        interval: float = WATCH_POLL_SECONDS,
+    ) -> None:
+        """Watch `active_styles`' inputs and `config_path`, starting from `ctx`.
+
+        `reload_config` reads and validates the edited config; `refetch`
+        builds a fresh context when the user's identity changes.
+        """
+        self.ctx = ctx
+        self._styles = active_styles
+        self._reload_config = reload_config
+        self._refetch = refetch
+        self._out_root = out_root
+        self._manifest = manifest
+        self._jobs = jobs
+        self._config_path = config_path
+        self.interval = interval
+        self._readers: dict[Path, set[str]] = {}
+        for name, style in active_styles.items():
+            for path in style_inputs(style):
+                self._readers.setdefault(path, set()).add(name)
+        self._files = FileWatcher([config_path, *self._readers])
+
+    def check(self) -> int:
+        """Poll once and re-render the styles affected by any change.
+
+        Returns the number of files written (0 on failure).
+        """
+        changed = self._files.changes()
+        if not changed:
+            return 0
+        start = time.perf_counter()
+        names = ", ".join(sorted(str(path) for path in changed))
+        try:
+            if self._config_path in changed:
+                self._reload()
+                affected = set(self._styles)
+            else:
+                affected = {n for path in changed for n in self._readers.get(path, ())}
+            styles = {n: s for n, s in self._styles.items() if n in affected}
+            invalidate_assets()
+            files_written = render_styles(
+                styles, self.ctx, self._out_root, self._manifest, self._jobs
+            )
+            if self._manifest is not None:
+                self._manifest.save()
+        except Exception:
+            logger.exception("Re-render failed after changes to %s", names)
+            return 0
+        logger.info(
+            "Changed %s → %s: %d file(s) in %.1f ms",
+            names,
+            ", ".join(styles),
+            files_written,
+            (time.perf_counter() - start) * 1000,
+        )
+        return files_written
+
+    def _reload(self) -> None:
+        """Rebuild the context for the edited config, refetching on a new identity."""
+        config = self._reload_config()
+        old = self.ctx.config
+        if (
+            config["user"]["name"] != old["user"]["name"]
+            or config["steam_id"] != old["steam_id"]
+        ):
+            self.ctx = self._refetch(config)
+            return
+        self.ctx = build_card_context(
+            self.ctx.data, config, self.ctx.steam_game, self.ctx.compact_heatmap
+        )
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Poll every `interval` seconds until `stop` is set."""
+        stop = stop or threading.Event()
+        logger.info(
+            "Watching %d file(s) every %.0f ms; Ctrl-C to stop",
+            len(self._files),
+            self.interval * 1000,
+        )
+        while not stop.wait(self.interval):
+            self.check()